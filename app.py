@@ -1,20 +1,26 @@
 import asyncio
+import bisect
+import copy
 import json
 import logging
+import math
 import os
 import random
 import re
 import sqlite3
-from datetime import datetime
-from typing import Optional, Dict, List, Any
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Any, Set, Deque
 
 import aiohttp
 from aiohttp import web
 import aiohttp_cors
 from aiofiles import open as aio_open
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import errors as pymongo_errors
+from pymongo import CursorType, ReturnDocument, errors as pymongo_errors
 from bson import ObjectId
+from collections import OrderedDict, deque
 
 log_formatter = logging.Formatter(
     '%(asctime)s - %(levelname)s - [%(name)s] - %(message)s',
@@ -66,7 +72,161 @@ SQLITE_DB = "registrations_backup.db"
 MASTER_PASSWORD = "0022"
 RATE_LIMIT_STORAGE = {}
 
-sse_clients: List[asyncio.Queue] = []
+# SSE backpressure: events live in a shared ring of SSE_RING_SIZE entries and
+# each client only holds a cursor into it. A client that falls further behind
+# than the ring holds is handled according to SSE_OVERFLOW_POLICY:
+#   drop_oldest - skip ahead to the oldest event still in the ring
+#   latest      - drop the whole backlog and send a resync event, so the
+#                 client refetches current state instead of replaying it
+#   disconnect  - evict the client with a retry: hint so it reconnects later
+SSE_RING_SIZE = int(os.environ.get("SSE_RING_SIZE", "512"))
+SSE_OVERFLOW_POLICIES = {"drop_oldest", "latest", "disconnect"}
+SSE_OVERFLOW_POLICY = os.environ.get("SSE_OVERFLOW_POLICY", "drop_oldest")
+if SSE_OVERFLOW_POLICY not in SSE_OVERFLOW_POLICIES:
+    logger.warning(f"Unknown SSE_OVERFLOW_POLICY '{SSE_OVERFLOW_POLICY}', using drop_oldest")
+    SSE_OVERFLOW_POLICY = "drop_oldest"
+SSE_RETRY_MS = int(os.environ.get("SSE_RETRY_MS", "3000"))
+# Each connection is told to wait SSE_RETRY_MS plus up to SSE_RETRY_JITTER_MS
+# before reconnecting, so a restart does not bring every client back at once
+SSE_RETRY_JITTER_MS = int(os.environ.get("SSE_RETRY_JITTER_MS", str(SSE_RETRY_MS)))
+# On shutdown, clients are told to reconnect within SSE_RECONNECT_SPREAD_MS and
+# closed in SSE_DRAIN_WAVES waves over SSE_DRAIN_SECONDS
+SSE_RECONNECT_SPREAD_MS = int(os.environ.get("SSE_RECONNECT_SPREAD_MS", "10000"))
+SSE_DRAIN_WAVES = int(os.environ.get("SSE_DRAIN_WAVES", "4"))
+SSE_DRAIN_SECONDS = float(os.environ.get("SSE_DRAIN_SECONDS", "2"))
+# Hot read endpoints are served from a short-lived cache so a reconnect burst
+# turns into one database query
+QUERY_CACHE_TTL = float(os.environ.get("QUERY_CACHE_TTL", "5"))
+# Heartbeats keep idle streams alive through proxies and expose half-open
+# connections; a client whose socket does not drain within SSE_WRITE_TIMEOUT
+# seconds is reaped
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get("SSE_HEARTBEAT_INTERVAL", "15"))
+SSE_WRITE_TIMEOUT = float(os.environ.get("SSE_WRITE_TIMEOUT", "10"))
+# Bursts of overlay state updates are merged into one frame per tick (0 disables)
+STREAM_COALESCE_MS = float(os.environ.get("STREAM_COALESCE_MS", "75"))
+
+# Viewer counts are published by a ticker rather than on every (dis)connect:
+# every VIEWER_COUNT_INTERVAL seconds, or within a second when the count has
+# moved by VIEWER_COUNT_CHANGE (a fraction of the last published count)
+VIEWER_COUNT_INTERVAL = float(os.environ.get("VIEWER_COUNT_INTERVAL", "5"))
+VIEWER_COUNT_CHANGE = float(os.environ.get("VIEWER_COUNT_CHANGE", "0.1"))
+# With a shared backplane each worker publishes its own count when it changes
+# and at least every VIEWER_COUNT_INTERVAL; viewers are shown the sum, and a
+# worker not heard from for VIEWER_COUNT_STALE seconds is left out of it
+VIEWER_COUNT_STALE = 3 * VIEWER_COUNT_INTERVAL
+# A viewer counts as present for PRESENCE_TTL seconds after its last ping
+# (live.html pings every 20s) or while its stream connection stays open
+PRESENCE_TTL = float(os.environ.get("PRESENCE_TTL", "45"))
+PRESENCE_MAX_VIEWERS = int(os.environ.get("PRESENCE_MAX_VIEWERS", "100000"))
+PRESENCE_MAX_BATCH = 100
+
+# Named live streams (one per court) served by this process; each has its own
+# overlay state, viewers and event ring. The first one is the default for
+# endpoints called without a channel
+STREAM_CHANNELS = [
+    name.strip() for name in os.environ.get("STREAM_CHANNELS", "main,A,B,C,D,E").split(",") if name.strip()
+]
+if not STREAM_CHANNELS:
+    raise SystemExit("STREAM_CHANNELS must name at least one stream channel, e.g. STREAM_CHANNELS=main,A,B")
+DEFAULT_STREAM_CHANNEL = STREAM_CHANNELS[0]
+
+# matchStart cues carry the instant the countdown ends, this far ahead, so
+# every viewer's countdown reaches zero together
+MATCH_START_COUNTDOWN_MS = 10000
+
+# /api/match-state?wait=N parks a poll whose ETag is current until the state
+# changes, for at most STATE_LONG_POLL_MAX seconds
+STATE_LONG_POLL_MAX = float(os.environ.get("STATE_LONG_POLL_MAX", "30"))
+
+# With a shared backplane, state versions are claimed from a counter in
+# MongoDB; a worker that lost the race waits up to STREAM_CLAIM_WAIT for the
+# winner's patch, STREAM_CLAIM_ATTEMPTS times, before answering 409
+STREAM_CLAIM_ATTEMPTS = 3
+STREAM_CLAIM_WAIT = 0.5
+
+# The overlay state is journalled to a local SQLite file off the request path:
+# changes are written as merge patches every STATE_JOURNAL_INTERVAL seconds and
+# folded into a full snapshot every STATE_SNAPSHOT_EVERY entries
+STATE_JOURNAL_DB = os.environ.get("STATE_JOURNAL_DB", "stream_state_backup.db")
+STATE_JOURNAL_INTERVAL = float(os.environ.get("STATE_JOURNAL_INTERVAL", "0.5"))
+STATE_SNAPSHOT_EVERY = int(os.environ.get("STATE_SNAPSHOT_EVERY", "100"))
+
+# Each client's pending events go out in two lanes: control (cues and state)
+# first, then bulk (chat, viewer counts). A client more than
+# SSE_SHED_BACKLOG events behind has its bulk events dropped instead
+SSE_SHED_BACKLOG = int(os.environ.get("SSE_SHED_BACKLOG", "64"))
+BULK_STREAM_EVENTS = {"chatBatch", "viewerCount"}
+
+# Per-connection gzip/deflate for SSE responses, negotiated via Accept-Encoding
+# and sync-flushed after every write. Each compressed client holds its own
+# zlib stream, so the window is kept small to bound memory per connection.
+SSE_COMPRESSION = os.environ.get("SSE_COMPRESSION", "false").lower() == "true"
+SSE_COMPRESSION_LEVEL = int(os.environ.get("SSE_COMPRESSION_LEVEL", "6"))
+SSE_COMPRESSION_WBITS = 12  # 4KB window
+SSE_COMPRESSION_MEMLEVEL = 5
+SSE_STATS = {
+    "coalesced_events": 0,
+    "dropped_events": 0,
+    "evicted_clients": 0,
+    "reaped_clients": 0,
+    "rejected_clients": 0,
+    "heartbeats_sent": 0,
+    "resumed_clients": 0,
+    "replayed_events": 0,
+    "shed_events": 0,
+    "compressed_clients": 0,
+    "compression_bytes_in": 0,
+    "compression_bytes_out": 0,
+    "chat_messages": 0,
+    "chat_batches": 0,
+    "chat_rate_limited": 0
+}
+
+# Cross-process fan-out so every worker's viewers see every event:
+#   memory - single process, events go straight to local clients
+#   unix   - workers on one host share a Unix domain socket broker
+#   mongo  - workers anywhere share a capped MongoDB collection
+EVENT_BACKPLANE = os.environ.get("EVENT_BACKPLANE", "memory")
+EVENT_BACKPLANE_SOCKET = os.environ.get("EVENT_BACKPLANE_SOCKET", "/tmp/astrisk-events.sock")
+EVENT_BACKPLANE_COLLECTION = os.environ.get("EVENT_BACKPLANE_COLLECTION", "event_bus")
+# Where database-driven SSE events come from:
+#   handlers       - each mutation handler broadcasts what it changed
+#   change_streams - a background task tails MongoDB change streams (needs a replica set)
+SSE_EVENT_SOURCE = os.environ.get("SSE_EVENT_SOURCE", "handlers")
+
+# Connection limits across both SSE channels; excess connections get a 503
+# with Retry-After so a reconnect loop or a single abusive client backs off
+SSE_MAX_CLIENTS = int(os.environ.get("SSE_MAX_CLIENTS", "20000"))
+SSE_MAX_CLIENTS_PER_IP = int(os.environ.get("SSE_MAX_CLIENTS_PER_IP", "50"))
+# Addresses of reverse proxies (comma-separated) whose X-Forwarded-For is
+# believed when applying per-client limits; anyone else is limited by the
+# address of the connection itself, since the header is trivial to forge
+TRUSTED_PROXIES = frozenset(
+    address.strip() for address in os.environ.get("TRUSTED_PROXIES", "").split(",") if address.strip()
+)
+
+# Live viewers may use a WebSocket at /api/stream-ws instead of SSE, which also
+# carries their chat messages and presence pings upstream on the same connection
+STREAM_WEBSOCKET = os.environ.get("STREAM_WEBSOCKET", "true").lower() == "true"
+STREAM_WS_MAX_MESSAGE = int(os.environ.get("STREAM_WS_MAX_MESSAGE", "4096"))
+
+# Live chat: each sender gets a token bucket of CHAT_BURST messages refilled at
+# CHAT_RATE per second. Accepted messages are sent to viewers as one chatBatch
+# frame per channel every CHAT_BATCH_MS, at most CHAT_BATCH_MAX messages each,
+# and the last CHAT_HISTORY_SIZE are replayed to viewers when they connect
+CHAT_RATE = float(os.environ.get("CHAT_RATE", "0.5"))
+CHAT_BURST = int(os.environ.get("CHAT_BURST", "3"))
+CHAT_BATCH_MS = float(os.environ.get("CHAT_BATCH_MS", "250"))
+CHAT_BATCH_MAX = int(os.environ.get("CHAT_BATCH_MAX", "50"))
+CHAT_HISTORY_SIZE = int(os.environ.get("CHAT_HISTORY_SIZE", "50"))
+CHAT_MAX_LENGTH = int(os.environ.get("CHAT_MAX_LENGTH", "150"))
+CHAT_MAX_SENDERS = int(os.environ.get("CHAT_MAX_SENDERS", "100000"))
+
+# Identifies this process's viewer count among the other workers'
+WORKER_ID = f"{os.getpid()}-{random.getrandbits(32):08x}"
+
+sse_clients: Set["SSEClient"] = set()
+sse_clients_per_ip: Dict[str, int] = {}
 
 def serialize_datetime(obj: Any) -> Any:
     if isinstance(obj, datetime):
@@ -80,6 +240,38 @@ def serialize_datetime(obj: Any) -> Any:
     else:
         return obj
 
+def make_merge_patch(old: Dict, new: Dict) -> Dict:
+    """Build a JSON merge patch (RFC 7386) that turns old into new"""
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = copy.deepcopy(value)
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            nested_patch = make_merge_patch(old[key], value)
+            if nested_patch:
+                patch[key] = nested_patch
+        elif old[key] != value:
+            patch[key] = copy.deepcopy(value)
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+def apply_merge_patch(target: Dict, patch: Dict) -> Dict:
+    """Apply a JSON merge patch (RFC 7386) to target in place"""
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict):
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            apply_merge_patch(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
 def init_sqlite():
     conn = sqlite3.connect(SQLITE_DB)
     cursor = conn.cursor()
@@ -357,26 +549,1114 @@ def get_client_ip(request: web.Request) -> str:
     return request.remote or '127.0.0.1'
 
 
+def get_limited_client_ip(request: web.Request) -> str:
+    """
+    Client address to apply limits to. X-Forwarded-For is only used when the
+    connection comes from a trusted proxy, and then only the hops added by
+    trusted proxies are skipped, so a client cannot pick its own address.
+    """
+    remote = request.remote or '127.0.0.1'
+    if remote not in TRUSTED_PROXIES:
+        return remote
+    hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+    for hop in reversed(hops):
+        if hop not in TRUSTED_PROXIES:
+            return hop
+    return remote
+
+
+class QueryCache:
+    """
+    Caches query results for a few seconds. Concurrent misses for the same
+    key share a single in-flight load instead of each hitting the database.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._generation = 0
+
+    async def get(self, key: str, loader):
+        """Return the cached value for key, calling loader() on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._loading[key] = task
+            generation = self._generation
+            
+            def store(done: asyncio.Task):
+                self._loading.pop(key, None)
+                # Results loaded across an invalidation may already be stale
+                if not done.cancelled() and done.exception() is None and generation == self._generation:
+                    self._entries[key] = (time.monotonic() + self.ttl, done.result())
+            
+            task.add_done_callback(store)
+        # Shielded so one caller disconnecting does not cancel the load for the rest
+        return await asyncio.shield(task)
+
+    def invalidate(self):
+        self._entries.clear()
+        self._generation += 1
+
+
+query_cache = QueryCache(QUERY_CACHE_TTL)
+
+
 # ============================================================================
 # SSE (Server-Sent Events) for Real-time Updates
 # ============================================================================
 
+def negotiate_sse_encoding(request: web.Request) -> Optional[str]:
+    """Pick gzip or deflate for an SSE response if enabled and accepted by the client"""
+    if not SSE_COMPRESSION:
+        return None
+    accepted = set()
+    for coding in request.headers.get('Accept-Encoding', '').split(','):
+        name, _, params = coding.partition(';')
+        quality = params.strip().lower()
+        if quality.startswith('q=') and quality[2:].strip('0.') == '':
+            continue  # q=0 means "not acceptable"
+        accepted.add(name.strip().lower())
+    for encoding in ('gzip', 'deflate'):
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def create_sse_compressor(encoding: Optional[str]):
+    """zlib stream matching a negotiated Content-Encoding, or None for identity"""
+    if encoding == 'gzip':
+        wbits = 16 + SSE_COMPRESSION_WBITS
+    elif encoding == 'deflate':
+        wbits = SSE_COMPRESSION_WBITS
+    else:
+        return None
+    return zlib.compressobj(SSE_COMPRESSION_LEVEL, zlib.DEFLATED, wbits, SSE_COMPRESSION_MEMLEVEL)
+
+
+def jittered_retry_ms() -> int:
+    """Reconnect delay for a new connection, spread so clients do not return in lockstep"""
+    return SSE_RETRY_MS + random.randint(0, SSE_RETRY_JITTER_MS)
+
+
+async def prepare_sse_response(request: web.Request) -> web.StreamResponse:
+    """Start an event-stream response, compressed if negotiated"""
+    response = web.StreamResponse()
+    response.headers['Content-Type'] = 'text/event-stream'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Connection'] = 'keep-alive'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+    
+    encoding = negotiate_sse_encoding(request)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        SSE_STATS["compressed_clients"] += 1
+    
+    await response.prepare(request)
+    return response
+
+
+class EventRing:
+    """
+    Append-only ring of recently broadcast SSE frames, shared by all clients
+    of a channel. Every frame is encoded once with a monotonically increasing
+    `id:` field, so clients only keep a cursor and can resume via Last-Event-ID.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        # Ids are prefixed with a per-process epoch so a resume after a restart
+        # is never mistaken for a position in the new ring
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self.last_id = 0
+        self._frames: List[Optional[bytes]] = [None] * capacity
+        # Compact `["<id>","<event>",<data>]` form of each frame for WebSocket clients
+        self._compact: List[Optional[str]] = [None] * capacity
+        self._topics: List[Optional[str]] = [None] * capacity
+        # (event type, monotonic creation time, bulk) of each frame, shared by all clients
+        self._meta: List[Optional[tuple]] = [None] * capacity
+        self._wakeup: Optional[asyncio.Event] = None
+        # Clients that asked for specific topics are indexed here and woken
+        # individually; everyone else shares the single _wakeup event
+        self._subscribers: Dict[str, Set["SSEClient"]] = {}
+        # Ids of recent events per topic, oldest first, so a filtered client's
+        # lag is measured in the events it subscribed to rather than all of them
+        self._topic_ids: Dict[str, List[int]] = {}
+        self._topic_trimmed: Dict[str, int] = {}  # Newest id dropped from each topic's list
+
+    @property
+    def first_id(self) -> int:
+        """Oldest event id still held in the ring"""
+        return max(1, self.last_id - self.capacity + 1)
+
+    def append(self, body: str, topic: Optional[str] = None, compact: Optional[str] = None,
+               bulk: bool = False, event_type: Optional[str] = None, created_at: Optional[float] = None) -> int:
+        """
+        Append an event body (its `event:`/`data:` lines) and wake interested
+        clients. `compact` is the `"<event>",<data>` pair sent to WebSocket
+        clients; `bulk` events are sent after control events and shed first.
+        `created_at` is the monotonic time the event was broadcast, from which
+        fan-out latency is measured (defaults to now).
+        """
+        self.last_id += 1
+        frame = f'id: {self.epoch}-{self.last_id}\n{body}\n\n'.encode('utf-8')
+        self._frames[self.last_id % self.capacity] = frame
+        self._compact[self.last_id % self.capacity] = (
+            f'["{self.epoch}-{self.last_id}",{compact}]' if compact is not None else None
+        )
+        self._topics[self.last_id % self.capacity] = topic
+        self._meta[self.last_id % self.capacity] = (
+            event_type, created_at if created_at is not None else time.monotonic(), bulk
+        )
+        if topic is not None:
+            ids = self._topic_ids.setdefault(topic, [])
+            ids.append(self.last_id)
+            if len(ids) > 2 * self.capacity:
+                self._topic_trimmed[topic] = ids[-self.capacity - 1]
+                del ids[:-self.capacity]
+        
+        if self._wakeup is not None:
+            self._wakeup.set()
+            self._wakeup = None
+        for client in self._subscribers.get(topic, ()):
+            client.wakeup.set()
+        return self.last_id
+
+    def frames_after(self, cursor: int, topics: Optional[frozenset] = None, compact: bool = False,
+                     shed_bulk: bool = False) -> tuple:
+        """
+        Frames newer than cursor, optionally only those in the given topics,
+        with the control lane ahead of the bulk lane. Returns the frames, the
+        metadata of each frame sent, and how many bulk frames were shed.
+        The caller must have checked the cursor is still in the ring.
+        """
+        source = self._compact if compact else self._frames
+        control = []
+        bulk = []
+        sent = []
+        shed = 0
+        for i in range(cursor + 1, self.last_id + 1):
+            slot = i % self.capacity
+            frame = source[slot]
+            if frame is None or (topics is not None and self._topics[slot] not in topics):
+                continue
+            meta = self._meta[slot]
+            if not meta[2]:
+                control.append(frame)
+            elif shed_bulk:
+                shed += 1
+                continue
+            else:
+                bulk.append(frame)
+            sent.append(meta)
+        return control + bulk, sent, shed
+
+    def count_topic_events(self, topics: frozenset, after: int, before: int) -> int:
+        """
+        How many events in the given topics have ids in (after, before). Events
+        older than the kept history count as one, which is enough to tell
+        that something was missed.
+        """
+        count = 0
+        for topic in topics:
+            ids = self._topic_ids.get(topic)
+            if ids:
+                count += bisect.bisect_left(ids, before) - bisect.bisect_right(ids, after)
+            if self._topic_trimmed.get(topic, 0) > after:
+                count += 1
+        return count
+
+    def subscribe(self, client: "SSEClient"):
+        """Index a topic-filtered client under each of its topics"""
+        for topic in client.topics:
+            self._subscribers.setdefault(topic, set()).add(client)
+
+    def subscriber_counts(self) -> Dict[str, int]:
+        return {topic: len(subscribers) for topic, subscribers in self._subscribers.items()}
+
+    def unsubscribe(self, client: "SSEClient"):
+        for topic in client.topics or ():
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    async def wait(self, cursor: int):
+        """Wait until an event newer than cursor has been appended, or the ring is woken"""
+        if cursor < self.last_id:
+            return
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        await self._wakeup.wait()
+
+    def wake(self):
+        """Wake all waiting clients without appending an event (used for heartbeats)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+            self._wakeup = None
+        for subscribers in self._subscribers.values():
+            for client in subscribers:
+                client.wakeup.set()
+
+    def resume_cursor(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Map a Last-Event-ID from this process back to a cursor, or None if unknown"""
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        cursor = int(seq)
+        if cursor > self.last_id:
+            return None
+        return cursor
+
+
+class SSEClient:
+    """A connected SSE (or WebSocket) client and its position in a channel's event ring"""
+
+    __slots__ = (
+        'request', 'response', 'ring', 'cursor', 'topics', 'wakeup',
+        'ip', 'task', 'heartbeat_due', 'write_started', 'websocket', 'compressor', 'reconnect_in',
+        'presence_id', 'resumed', 'resync_due'
+    )
+
+    def __init__(self, request: web.Request, response: web.StreamResponse, ring: EventRing, cursor: int,
+                 topics: Optional[frozenset] = None):
+        self.request = request
+        self.response = response
+        self.ring = ring
+        self.cursor = cursor
+        self.topics = topics  # None means every topic
+        self.wakeup: Optional[asyncio.Event] = asyncio.Event() if topics is not None else None
+        self.ip = get_limited_client_ip(request)
+        self.task = asyncio.current_task()
+        self.heartbeat_due = False
+        self.write_started: Optional[float] = None  # Monotonic start of an in-flight write
+        self.websocket = isinstance(response, web.WebSocketResponse)
+        self.compressor = create_sse_compressor(response.headers.get('Content-Encoding'))
+        self.reconnect_in: Optional[int] = None  # Set when the server is draining connections
+        self.presence_id: Optional[str] = None  # Stream viewers only
+        self.resumed = False  # Reconnected with a Last-Event-ID still in the ring
+        self.resync_due = False  # Events were skipped under the latest policy
+
+
+sse_event_ring = EventRing("sse", SSE_RING_SIZE)
+
+# Topics that /api/sse clients can filter on with ?topics=a,b
+SSE_EVENT_TOPICS = {
+    "match_created": "matches",
+    "match_updated": "matches",
+    "match_deleted": "matches",
+    "match_completed": "matches",
+    "active_match_changed": "matches",
+    "bracket_initialized": "matches",
+    "winners_advanced": "matches",
+    "lap_updated": "laps",
+    "pause_screen": "pause",
+    "team_stats_updated": "teams",
+    "registration_updated": "teams"
+}
+SSE_TOPICS = frozenset(SSE_EVENT_TOPICS.values()) | {"general"}
+
+
+def get_sse_topic(event_type: str) -> str:
+    return SSE_EVENT_TOPICS.get(event_type, "general")
+
+
+def parse_sse_topics(request: web.Request) -> Optional[frozenset]:
+    """Topics requested via ?topics=, or None for all; raises ValueError on unknown topics"""
+    raw_topics = request.query.get('topics', '').strip()
+    if not raw_topics:
+        return None
+    topics = frozenset(topic.strip() for topic in raw_topics.split(',') if topic.strip())
+    unknown = topics - SSE_TOPICS
+    if unknown:
+        raise ValueError(f"Unknown topics: {', '.join(sorted(unknown))}")
+    return topics
+
+
+def open_sse_client(request: web.Request, response: web.StreamResponse, ring: EventRing,
+                    topics: Optional[frozenset] = None) -> SSEClient:
+    """
+    Create a client positioned at the end of the ring, or at its Last-Event-ID
+    when reconnecting so that only the missed events are replayed.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.query.get('lastEventId')
+    cursor = ring.resume_cursor(last_event_id)
+    if cursor is None:
+        client = SSEClient(request, response, ring, ring.last_id, topics)
+    else:
+        # Events older than the ring are gone; replay whatever is still held
+        if cursor < ring.first_id - 1:
+            SSE_STATS["dropped_events"] += ring.first_id - 1 - cursor
+            cursor = ring.first_id - 1
+        
+        SSE_STATS["resumed_clients"] += 1
+        SSE_STATS["replayed_events"] += ring.last_id - cursor
+        client = SSEClient(request, response, ring, cursor, topics)
+        client.resumed = True
+    
+    if topics is not None:
+        ring.subscribe(client)
+        if client.cursor < ring.last_id:
+            client.wakeup.set()  # Replay the backlog straight away
+    return client
+
+
+def reject_sse_client(request: web.Request) -> Optional[web.Response]:
+    """Return a 503 response if accepting this connection would exceed a limit"""
+    if len(sse_clients) + count_stream_viewers() >= SSE_MAX_CLIENTS:
+        message = "Server is at its connection limit"
+    elif sse_clients_per_ip.get(get_limited_client_ip(request), 0) >= SSE_MAX_CLIENTS_PER_IP:
+        message = "Too many connections from your address"
+    else:
+        return None
+    
+    SSE_STATS["rejected_clients"] += 1
+    return web.json_response({
+        "success": False,
+        "message": message
+    }, status=503, headers={'Retry-After': str(max(1, round(SSE_RETRY_MS / 1000)))})
+
+
+def register_sse_client(clients: Set[SSEClient], client: SSEClient):
+    clients.add(client)
+    sse_clients_per_ip[client.ip] = sse_clients_per_ip.get(client.ip, 0) + 1
+
+
+def unregister_sse_client(clients: Set[SSEClient], client: SSEClient):
+    """Remove a client from its registry; safe to call more than once"""
+    if client not in clients:
+        return
+    clients.remove(client)
+    remaining = sse_clients_per_ip.get(client.ip, 1) - 1
+    if remaining > 0:
+        sse_clients_per_ip[client.ip] = remaining
+    else:
+        sse_clients_per_ip.pop(client.ip, None)
+
+
+def close_sse_client(client: SSEClient):
+    """Remove a client from its ring's topic index"""
+    if client.topics is not None:
+        client.ring.unsubscribe(client)
+
+
+
+def skip_lagged_events(client: SSEClient) -> bool:
+    """
+    Apply the overflow policy to a client whose cursor fell out of the ring.
+    Returns False if the client should be evicted.
+    """
+    ring = client.ring
+    if client.cursor >= ring.first_id - 1:
+        return True
+    
+    if client.topics is None:
+        lost = ring.first_id - 1 - client.cursor
+    else:
+        # Only events in the client's topics count; the rest were never for it
+        lost = ring.count_topic_events(client.topics, client.cursor, ring.first_id)
+        if not lost:
+            client.cursor = ring.first_id - 1
+            return True
+    
+    if SSE_OVERFLOW_POLICY == "disconnect":
+        SSE_STATS["dropped_events"] += lost
+        SSE_STATS["evicted_clients"] += 1
+        return False
+    
+    if SSE_OVERFLOW_POLICY == "latest":
+        # Events are deltas and one-shot cues, so none can stand in for the
+        # ones skipped; the client is told to refetch instead
+        if client.topics is None:
+            lost += ring.last_id - ring.first_id + 1
+        else:
+            lost += ring.count_topic_events(client.topics, ring.first_id - 1, ring.last_id + 1)
+        new_cursor = ring.last_id
+        client.resync_due = True
+    else:
+        new_cursor = ring.first_id - 1
+    SSE_STATS["dropped_events"] += lost
+    client.cursor = new_cursor
+    return True
+
+
+async def write_sse_frame(client: SSEClient, frame, final: bool = False) -> bool:
+    """
+    Write to a client's stream (bytes) or WebSocket (str). Compressed streams
+    are sync-flushed so the frame is decodable immediately, or finished if
+    this is the last write. A write that does not drain within
+    SSE_WRITE_TIMEOUT is aborted by the heartbeat loop, which raises here.
+    Returns False if the client is gone.
+    """
+    if client.compressor is not None:
+        compressed = client.compressor.compress(frame)
+        compressed += client.compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        SSE_STATS["compression_bytes_in"] += len(frame)
+        SSE_STATS["compression_bytes_out"] += len(compressed)
+        frame = compressed
+    
+    # Timestamped rather than wrapped in wait_for, which would cost a task per
+    # write per client on every broadcast
+    client.write_started = time.monotonic()
+    try:
+        if client.websocket:
+            await client.response.send_str(frame)
+        else:
+            await client.response.write(frame)
+    except ConnectionResetError:
+        return False
+    finally:
+        client.write_started = None
+    return True
+
+
+async def pump_sse_events(client: SSEClient):
+    """Write events from the client's cursor onwards until it disconnects or is evicted"""
+    ring = client.ring
+    while True:
+        if client.topics is None:
+            await ring.wait(client.cursor)
+        else:
+            # Only woken for matching topics (or heartbeats), not every broadcast
+            await client.wakeup.wait()
+            client.wakeup.clear()
+        
+        if client.reconnect_in is not None:
+            await write_reconnect_frame(client, client.reconnect_in, "server restarting")
+            return
+        
+        if not skip_lagged_events(client):
+            # Tell the evicted client when to reconnect before closing its stream
+            await write_reconnect_frame(client, jittered_retry_ms(), "slow consumer evicted")
+            return
+        
+        if client.resync_due:
+            client.resync_due = False
+            if not await write_sse_frame(client, encode_resync_frame(client)):
+                return
+        
+        if client.cursor >= ring.last_id:
+            payload = None
+        else:
+            # A client this far behind is not keeping up; drop its chat before its cues
+            if client.topics is None:
+                backlog = ring.last_id - client.cursor
+            else:
+                backlog = ring.count_topic_events(client.topics, client.cursor, ring.last_id + 1)
+            shed_bulk = backlog > SSE_SHED_BACKLOG
+            frames, sent, shed = ring.frames_after(
+                client.cursor, client.topics, client.websocket, shed_bulk
+            )
+            SSE_STATS["shed_events"] += shed
+            if client.websocket:
+                # Everything pending goes out as one WebSocket message
+                payload = f'[{",".join(frames)}]' if frames else None
+            else:
+                payload = b''.join(frames)
+        client.cursor = ring.last_id
+        if payload:
+            client.heartbeat_due = False
+            if not await write_sse_frame(client, payload):
+                return
+            record_fanout_latency(ring.name, sent)
+        elif client.heartbeat_due and client.websocket:
+            client.heartbeat_due = False  # WebSocket keepalive uses protocol-level pings
+        elif client.heartbeat_due:
+            client.heartbeat_due = False
+            SSE_STATS["heartbeats_sent"] += 1
+            if not await write_sse_frame(client, b': heartbeat\n\n'):
+                return
+
+
+def encode_resync_frame(client: SSEClient):
+    """Frame telling a client that events were skipped and it should refetch its state"""
+    if client.websocket:
+        return '[[null,"resync",{}]]'
+    if client.ring is sse_event_ring:
+        return b'data: {"type": "resync", "data": {}}\n\n'
+    return b'event: resync\ndata: {}\n\n'
+
+
+async def write_reconnect_frame(client: SSEClient, retry_ms: int, reason: str):
+    """Final frame telling a client when to reconnect before its stream is closed"""
+    if client.websocket:
+        await write_sse_frame(client, f'[[null,"reconnect",{{"retryMs":{retry_ms}}}]]')
+    else:
+        await write_sse_frame(client, (
+            f'retry: {retry_ms}\n: {reason}\n'
+            f'event: reconnect\ndata: {{"retryMs": {retry_ms}}}\n\n'
+        ).encode('utf-8'), final=True)
+
+
+async def drain_sse_clients(app: web.Application):
+    """
+    On shutdown, tell every client to reconnect after a random delay within
+    SSE_RECONNECT_SPREAD_MS and close their streams in waves, so the next
+    process is not hit by every client at once.
+    """
+    clients = list(sse_clients)
+    for channel in stream_channels.values():
+        clients.extend(channel.viewers)
+    if not clients:
+        return
+    
+    random.shuffle(clients)
+    waves = max(1, SSE_DRAIN_WAVES)
+    wave_size = -(-len(clients) // waves)
+    logger.info(f"Draining {len(clients)} SSE clients in {waves} waves")
+    for start in range(0, len(clients), wave_size):
+        for client in clients[start:start + wave_size]:
+            client.reconnect_in = SSE_RETRY_MS + random.randint(0, SSE_RECONNECT_SPREAD_MS)
+            if client.wakeup is not None:
+                client.wakeup.set()
+        wake_all_rings()
+        await asyncio.sleep(SSE_DRAIN_SECONDS / waves)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are reported as bucket upper bounds (capped at the max)"""
+
+    # Bucket upper bounds in seconds, roughly logarithmic from 0.5ms to 10s
+    BOUNDS = [
+        0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05,
+        0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0
+    ]
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram"):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (seconds) of the bucket holding the q-th percentile"""
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 2),
+            "p95_ms": round(self.percentile(0.95) * 1000, 2),
+            "p99_ms": round(self.percentile(0.99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2)
+        }
+
+
+# Broadcast-to-write-complete latency per (channel, event type), one sample per client write
+FANOUT_LATENCY: Dict[tuple, LatencyHistogram] = {}
+
+
+def record_fanout_latency(channel: str, sent: List[tuple]):
+    """Record how long each event just written took from broadcast to this client"""
+    now = time.monotonic()
+    for event_type, created_at, _ in sent:
+        histogram = FANOUT_LATENCY.get((channel, event_type))
+        if histogram is None:
+            histogram = FANOUT_LATENCY[(channel, event_type)] = LatencyHistogram()
+        histogram.record(now - created_at)
+
+
+def get_cue_latency_stats() -> Dict[str, Dict[str, float]]:
+    """Fan-out latency of control events (everything but chat and viewer counts), per channel"""
+    merged: Dict[str, LatencyHistogram] = {}
+    for (channel, event_type), histogram in FANOUT_LATENCY.items():
+        if event_type in BULK_STREAM_EVENTS:
+            continue
+        merged.setdefault(channel, LatencyHistogram()).merge(histogram)
+    return {channel: histogram.summary() for channel, histogram in merged.items()}
+
+
+def abort_sse_client(client: SSEClient):
+    """Drop the client's socket so a stalled write cannot block handler cleanup"""
+    transport = client.request.transport
+    if transport is not None:
+        transport.abort()
+
+
+def is_sse_client_dead(client: SSEClient, now: float) -> bool:
+    """A client is dead if its transport is gone or a write has stalled past the timeout"""
+    transport = client.request.transport
+    if transport is None or transport.is_closing():
+        return True
+    return client.write_started is not None and now - client.write_started > SSE_WRITE_TIMEOUT
+
+
+async def sse_heartbeat_loop():
+    """
+    Background task that periodically reaps dead SSE clients and asks the
+    remaining ones to write a heartbeat comment if they have been idle.
+    """
+    while True:
+        await asyncio.sleep(SSE_HEARTBEAT_INTERVAL)
+        now = time.monotonic()
+        registries = [(sse_clients, None)]
+        registries.extend((channel.viewers, channel.presence) for channel in stream_channels.values())
+        for clients, presence in registries:
+            for client in list(clients):
+                if is_sse_client_dead(client, now):
+                    if presence is not None and client.presence_id is not None:
+                        presence.detach(client.presence_id)
+                    unregister_sse_client(clients, client)
+                    SSE_STATS["reaped_clients"] += 1
+                    abort_sse_client(client)
+                    if client.task is not None:
+                        client.task.cancel()
+                else:
+                    client.heartbeat_due = True
+                    if presence is not None and client.presence_id is not None:
+                        # An open stream keeps its viewer present without pings
+                        presence.ping(client.presence_id, now)
+        
+        wake_all_rings()
+
+
 async def broadcast_sse_event(event_type: str, data: Dict):
     """Broadcast an event to all connected SSE clients"""
-    event_data = json.dumps({"type": event_type, "data": data})
-    dead_clients = []
+    await event_backplane.publish("sse", event_type, data, time.monotonic())
     
-    for i, client_queue in enumerate(sse_clients):
+    logger.info(f"Broadcasted SSE event '{event_type}' to {len(sse_clients)} clients")
+
+
+def build_match_delta(match: Dict, changes: Dict) -> Dict:
+    """
+    Versioned delta event for a match carrying only the fields that changed.
+    Clients whose copy is not at `base` should refetch the match.
+    """
+    version = match.get("version", 1)
+    return {
+        "_id": str(match["_id"]),
+        "base": version - 1,
+        "version": version,
+        "patch": serialize_datetime(changes)
+    }
+
+
+async def emit_db_event(event_type: str, data: Dict):
+    """
+    Broadcast an event describing a single document change. Skipped when
+    change streams are the event source, since they emit it themselves.
+    """
+    if SSE_EVENT_SOURCE == "change_streams":
+        return
+    await broadcast_sse_event(event_type, data)
+
+
+# ============================================================================
+# EVENT BACKPLANE (cross-process fan-out)
+# ============================================================================
+
+def deliver_local_event(channel: str, event_type: str, data: Dict, created_at: Optional[float] = None):
+    """
+    Append an event received from the backplane to this worker's ring.
+    created_at is the monotonic broadcast time if it was taken on this host.
+    """
+    if channel == "sse":
+        if event_type == "team_stats_updated":
+            # Changed outside this worker (change streams); refresh the viewers' copy
+            query_cache.invalidate()
+            asyncio.ensure_future(refresh_local_team_stats())
+        sse_event_ring.append(
+            f'data: {json.dumps({"type": event_type, "data": data})}', get_sse_topic(event_type),
+            event_type=event_type, created_at=created_at
+        )
+    elif find_stream_channel(channel) is not None:
+        stream_channel = find_stream_channel(channel)
+        if event_type == "workerViewerCount":
+            # Bookkeeping for the summed count, not shown to viewers as-is
+            if data["worker"] != WORKER_ID:
+                stream_channel.worker_counts[data["worker"]] = (data["count"], time.monotonic())
+            return
+        if event_type == "state_patch":
+            # Keep this worker's overlay state in step with the worker that changed it
+            state = stream_channel.state
+            state.update(data["patch"])
+            state.version = max(state.version, data["version"])
+            stream_channel.notify_state_changed()
+            stream_coalescer.set_baseline(channel, state.to_dict())
+        elif event_type == "teamStats":
+            stream_team_stats[:] = data["teams"]
+            stream_channel.snapshot_cache.clear()
+        elif event_type == "chatBatch":
+            stream_channel.chat.remember(data["messages"])
+        stream_channel.append_event(event_type, data, created_at)
+    else:
+        logger.warning(f"Dropping backplane event for unknown channel '{channel}'")
+
+
+class EventBackplane:
+    """
+    In-process backplane: events are delivered straight to this worker's
+    clients. Subclasses relay them through a shared transport instead, and
+    every worker (including the publisher) delivers each event exactly once.
+    """
+
+    name = "memory"
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, channel: str, event_type: str, data: Dict, created_at: Optional[float] = None):
+        deliver_local_event(channel, event_type, data, created_at)
+
+
+class UnixSocketBackplane(EventBackplane):
+    """
+    Backplane for workers on one host. The first worker to lock
+    `<socket>.lock` runs a broker that relays every line it receives to all
+    connected workers; if it exits, the survivors elect a new broker.
+    """
+
+    name = "unix"
+    LINE_LIMIT = 4 * 1024 * 1024
+    PEER_BUFFER_LIMIT = 8 * 1024 * 1024
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock_file = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._subscribe())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._server:
+            self._server.close()
+            for peer in list(self._peers):
+                peer.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self._lock_file.close()
+
+    async def _try_become_broker(self):
+        """Start the broker if no other worker currently holds the lock"""
+        if self._server is not None:
+            return
+        import fcntl
+        
+        lock_file = open(f"{self.path}.lock", 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return
+        
+        self._lock_file = lock_file
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Stale socket from a broker that died
+        self._server = await asyncio.start_unix_server(self._relay, path=self.path, limit=self.LINE_LIMIT)
+        logger.info(f"✓ Event backplane broker listening on {self.path} (pid {os.getpid()})")
+
+    async def _relay(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Broker side: forward each line from one worker to every worker"""
+        self._peers.add(writer)
         try:
-            await client_queue.put(event_data)
-        except:
-            dead_clients.append(i)
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for peer in list(self._peers):
+                    if peer.transport.get_write_buffer_size() > self.PEER_BUFFER_LIMIT:
+                        # A worker that stopped reading reconnects and catches up via its own ring
+                        logger.warning("Dropping stalled worker from event backplane")
+                        self._peers.discard(peer)
+                        peer.close()
+                        continue
+                    peer.write(line)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.warning(f"Event backplane peer error: {e}")
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    async def _subscribe(self):
+        """Worker side: stay connected to the broker and deliver what it relays"""
+        while True:
+            try:
+                await self._try_become_broker()
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=self.LINE_LIMIT)
+            except OSError:
+                await asyncio.sleep(0.5)
+                continue
+            
+            self._writer = writer
+            logger.info(f"✓ Connected to event backplane at {self.path}")
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    message = json.loads(line)
+                    # Monotonic clocks are shared by every process on this host
+                    deliver_local_event(message["channel"], message["type"], message["data"], message.get("created"))
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"Event backplane connection error: {e}")
+            finally:
+                self._writer = None
+                writer.close()
+            logger.warning("Lost event backplane broker, reconnecting...")
+            await asyncio.sleep(0.5)
+
+    async def publish(self, channel: str, event_type: str, data: Dict, created_at: Optional[float] = None):
+        if self._writer is None:
+            logger.warning(f"Event backplane unavailable, delivering '{event_type}' locally only")
+            deliver_local_event(channel, event_type, data, created_at)
+            return
+        line = json.dumps({"channel": channel, "type": event_type, "data": data, "created": created_at}) + "\n"
+        self._writer.write(line.encode('utf-8'))
+
+
+class MongoBackplane(EventBackplane):
+    """
+    Backplane for workers on any host, using a capped collection that every
+    worker tails. Events are delivered in insertion order, once per worker.
+    """
+
+    name = "mongo"
+    COLLECTION_SIZE = 16 * 1024 * 1024
+    SEEN_LIMIT = 1024
+
+    def __init__(self, collection_name: str):
+        self.collection_name = collection_name
+        self.collection = db[collection_name]
+        self._task: Optional[asyncio.Task] = None
+        self._seen: "OrderedDict[ObjectId, None]" = OrderedDict()
+
+    async def start(self):
+        try:
+            await db.create_collection(self.collection_name, capped=True, size=self.COLLECTION_SIZE)
+        except pymongo_errors.CollectionInvalid:
+            pass  # Already exists
+        self._task = asyncio.create_task(self._subscribe())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def _first_delivery(self, event_id: ObjectId) -> bool:
+        """Guard against redelivery when the tailable cursor is re-opened"""
+        if event_id in self._seen:
+            return False
+        self._seen[event_id] = None
+        if len(self._seen) > self.SEEN_LIMIT:
+            self._seen.popitem(last=False)
+        return True
+
+    async def _subscribe(self):
+        # Start from the newest event so history is not replayed on startup
+        latest = await self.collection.find_one(sort=[("$natural", -1)])
+        since = latest["_id"].generation_time if latest else datetime.utcnow()
+        if latest:
+            self._first_delivery(latest["_id"])
+        
+        while True:
+            # ObjectIds from different workers are not strictly ordered, so
+            # re-open a little in the past and rely on the seen-set to dedupe
+            query = {"_id": {"$gte": ObjectId.from_datetime(since - timedelta(seconds=2))}}
+            cursor = self.collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+            try:
+                async for event in cursor:
+                    since = event["_id"].generation_time
+                    if self._first_delivery(event["_id"]):
+                        deliver_local_event(event["channel"], event["type"], event["data"])
+            except pymongo_errors.PyMongoError as e:
+                logger.warning(f"Event backplane tail error: {e}")
+            await asyncio.sleep(0.5)
+
+    async def publish(self, channel: str, event_type: str, data: Dict, created_at: Optional[float] = None):
+        # Monotonic times do not carry across hosts, so latency is measured from receipt
+        try:
+            await self.collection.insert_one({
+                "channel": channel,
+                "type": event_type,
+                "data": data,
+                "created_at": datetime.utcnow()
+            })
+        except pymongo_errors.PyMongoError as e:
+            logger.warning(f"Event backplane publish failed, delivering '{event_type}' locally only: {e}")
+            deliver_local_event(channel, event_type, data, created_at)
+
+
+def create_event_backplane(kind: str) -> EventBackplane:
+    """Build the configured backplane, falling back to in-process delivery"""
+    if kind == "unix":
+        return UnixSocketBackplane(EVENT_BACKPLANE_SOCKET)
+    if kind == "mongo":
+        return MongoBackplane(EVENT_BACKPLANE_COLLECTION)
+    if kind != "memory":
+        logger.warning(f"Unknown EVENT_BACKPLANE '{kind}', using in-process delivery")
+    return EventBackplane()
+
+
+event_backplane = create_event_backplane(EVENT_BACKPLANE)
+
+
+# ============================================================================
+# CHANGE STREAM EVENT SOURCE
+# ============================================================================
+
+CHANGE_STREAM_COLLECTIONS = ["matches", "lap_times", "team_stats", "registrations"]
+CHANGE_STREAM_TOKEN_SAVE_INTERVAL = 1.0  # seconds between resume token writes
+
+
+def serialize_change_document(document: Dict) -> Dict:
+    """Make a change stream document JSON-safe the same way the handlers do"""
+    document = dict(document)
+    document['_id'] = str(document['_id'])
+    return serialize_datetime(document)
+
+
+def change_to_sse_events(collection_name: str, change: Dict) -> List[tuple]:
+    """Map one change stream event to the SSE events the handlers would have sent"""
+    operation = change["operationType"]
+    document = change.get("fullDocument")
+    document_id = str(change["documentKey"]["_id"]) if "documentKey" in change else None
     
-    # Remove dead clients
-    for i in reversed(dead_clients):
-        sse_clients.pop(i)
+    if collection_name == "matches":
+        if operation == "delete":
+            return [("match_deleted", {"match_id": document_id})]
+        if document is None:
+            return []
+        if operation == "insert":
+            return [("match_created", serialize_change_document(document))]
+        if operation == "replace":
+            replacement = serialize_change_document(document)
+            replacement.pop("_id")
+            return [("match_updated", build_match_delta(document, replacement))]
+        
+        description = change.get("updateDescription", {})
+        updated_fields = dict(description.get("updatedFields", {}))
+        updated_fields.pop("version", None)
+        for field in description.get("removedFields", []):
+            updated_fields[field] = None
+        delta = build_match_delta(document, updated_fields)
+        if updated_fields.get("status") == "completed":
+            return [("match_completed", delta)]
+        if updated_fields.get("is_active") is True:
+            return [("active_match_changed", delta)]
+        return [("match_updated", delta)]
     
-    logger.info(f"Broadcasted SSE event '{event_type}' to {len(sse_clients)} clients")
+    if collection_name == "lap_times":
+        if operation == "delete" or document is None:
+            return [("lap_updated", {"id": document_id})]
+        return [("lap_updated", serialize_change_document(document))]
+    
+    if collection_name == "team_stats":
+        if operation == "delete" or document is None:
+            return [("team_stats_updated", {"_id": document_id, "deleted": True})]
+        return [("team_stats_updated", serialize_change_document(document))]
+    
+    if collection_name == "registrations":
+        # Registrations hold contact details, so only public fields are broadcast
+        if operation == "delete" or document is None:
+            return [("registration_updated", {"_id": document_id, "deleted": True})]
+        return [("registration_updated", {
+            "_id": document_id,
+            "team_name": document.get("team_name"),
+            "payment_status": document.get("payment_status"),
+            "is_open": document.get("is_open", False)
+        })]
+    
+    return []
+
+
+async def load_resume_token(collection_name: str) -> Optional[Dict]:
+    config = await db.config.find_one({"key": f"change_stream_resume:{collection_name}"})
+    return config.get("value") if config else None
+
+
+async def save_resume_token(collection_name: str, token: Optional[Dict]):
+    await db.config.update_one(
+        {"key": f"change_stream_resume:{collection_name}"},
+        {"$set": {"value": token, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+async def tail_change_stream(collection_name: str):
+    """
+    Emit SSE events for every change to a collection, resuming after the last
+    persisted token so changes made while the app was down are not lost.
+    """
+    global SSE_EVENT_SOURCE
+    collection = db[collection_name]
+    resume_token = await load_resume_token(collection_name)
+    
+    while True:
+        last_saved = time.monotonic()
+        try:
+            async with collection.watch(full_document="updateLookup", resume_after=resume_token) as stream:
+                logger.info(f"✓ Tailing change stream on '{collection_name}'")
+                async for change in stream:
+                    # Each worker tails independently, so deliver locally rather than via the backplane
+                    for event_type, data in change_to_sse_events(collection_name, change):
+                        deliver_local_event("sse", event_type, data)
+                    
+                    resume_token = stream.resume_token
+                    if time.monotonic() - last_saved >= CHANGE_STREAM_TOKEN_SAVE_INTERVAL:
+                        await save_resume_token(collection_name, resume_token)
+                        last_saved = time.monotonic()
+        except asyncio.CancelledError:
+            if resume_token is not None:
+                await save_resume_token(collection_name, resume_token)
+            raise
+        except pymongo_errors.OperationFailure as e:
+            if e.code == 40573:
+                # Standalone server: change streams are unavailable, go back to handler events
+                logger.error("✗ Change streams need a replica set; falling back to handler events")
+                SSE_EVENT_SOURCE = "handlers"
+                return
+            if e.code == 286 or "resume" in str(e).lower():
+                logger.warning(f"Change stream history lost for '{collection_name}', resuming from now")
+                resume_token = None
+                await save_resume_token(collection_name, None)
+            else:
+                logger.warning(f"Change stream error on '{collection_name}': {e}")
+        except pymongo_errors.PyMongoError as e:
+            logger.warning(f"Change stream error on '{collection_name}': {e}")
+        await asyncio.sleep(1)
 
 
 # ============================================================================
@@ -499,36 +1779,43 @@ async def get_tournament_advancement_status() -> Dict[str, Any]:
 
 
 async def sse_handler(request: web.Request) -> web.StreamResponse:
-    """Server-Sent Events endpoint for real-time match updates"""
-    response = web.StreamResponse()
-    response.headers['Content-Type'] = 'text/event-stream'
-    response.headers['Cache-Control'] = 'no-cache'
-    response.headers['Connection'] = 'keep-alive'
-    response.headers['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+    """Server-Sent Events endpoint for real-time match updates (?topics=matches,laps,pause,teams)"""
+    try:
+        topics = parse_sse_topics(request)
+    except ValueError as e:
+        return web.json_response({
+            "success": False,
+            "message": str(e)
+        }, status=400)
     
-    await response.prepare(request)
+    rejection = reject_sse_client(request)
+    if rejection is not None:
+        return rejection
+    
+    response = await prepare_sse_response(request)
     
-    # Create a queue for this client
-    client_queue = asyncio.Queue()
-    sse_clients.append(client_queue)
+    # Register a cursor into the shared event ring for this client
+    client = open_sse_client(request, response, sse_event_ring, topics)
+    register_sse_client(sse_clients, client)
     
     logger.info(f"New SSE client connected. Total clients: {len(sse_clients)}")
     
     try:
         # Send initial connection confirmation
-        await response.write(b'data: {"type":"connected","message":"SSE connection established"}\n\n')
+        await write_sse_frame(client, (
+            f'retry: {jittered_retry_ms()}\n'
+            'data: {"type":"connected","message":"SSE connection established"}\n\n'
+        ).encode('utf-8'))
         
-        # Keep sending events from the queue
-        while True:
-            event_data = await client_queue.get()
-            await response.write(f'data: {event_data}\n\n'.encode('utf-8'))
+        # Keep sending events from the ring
+        await pump_sse_events(client)
     except asyncio.CancelledError:
         pass
     except Exception as e:
         logger.error(f"SSE error: {e}")
     finally:
-        if client_queue in sse_clients:
-            sse_clients.remove(client_queue)
+        unregister_sse_client(sse_clients, client)
+        close_sse_client(client)
         logger.info(f"SSE client disconnected. Remaining clients: {len(sse_clients)}")
     
     return response
@@ -583,6 +1870,7 @@ async def create_match(request: web.Request) -> web.Response:
             "team2_seed": data.get("team2_seed"),
             "winner": data.get("winner"),  # null until match is completed
             "status": data.get("status", "upcoming"),  # "upcoming", "live", "completed"
+            "version": 1,  # Bumped on every update; delta events carry it
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
@@ -592,7 +1880,7 @@ async def create_match(request: web.Request) -> web.Response:
         
         match_data = serialize_datetime(match_data)
         
-        await broadcast_sse_event("match_created", match_data)
+        await emit_db_event("match_created", match_data)
         
         return web.json_response({
             "success": True,
@@ -639,29 +1927,23 @@ async def update_match(request: web.Request) -> web.Response:
             if field in data:
                 update_data[field] = data[field]
         
-        result = await matches_collection.update_one(
+        updated_match = await matches_collection.find_one_and_update(
             {"_id": match_id},
-            {"$set": update_data}
+            {"$set": update_data, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
-            return web.json_response({
-                "success": False,
-                "message": "Match not found"
-            }, status=404)
-        
-        updated_match = await matches_collection.find_one({"_id": match_id})
         if updated_match is None:
             return web.json_response({
                 "success": False,
-                "message": "Match not found after update"
+                "message": "Match not found"
             }, status=404)
             
         updated_match['_id'] = str(updated_match['_id'])
         
         updated_match = serialize_datetime(updated_match)
         
-        await broadcast_sse_event("match_updated", updated_match)
+        await emit_db_event("match_updated", build_match_delta(updated_match, update_data))
         
         return web.json_response({
             "success": True,
@@ -707,7 +1989,7 @@ async def delete_match(request: web.Request) -> web.Response:
             }, status=404)
         
         # Broadcast to SSE clients
-        await broadcast_sse_event("match_deleted", {"match_id": match_id_str})
+        await emit_db_event("match_deleted", {"match_id": match_id_str})
         
         return web.json_response({
             "success": True,
@@ -939,42 +2221,45 @@ async def set_active_match(request: web.Request) -> web.Response:
                 "message": "Invalid match ID format"
             }, status=400)
         
-        # Deactivate all other matches
-        await matches_collection.update_many(
-            {},
-            {"$set": {"is_active": False}}
-        )
+        # Deactivate all other matches one by one, so each gets its own
+        # versioned delta and clients holding it stay in step
+        deactivated = []
+        async for other in matches_collection.find(
+            {"is_active": True, "_id": {"$ne": match_id}}, {"_id": 1}
+        ):
+            other_match = await matches_collection.find_one_and_update(
+                {"_id": other["_id"], "is_active": True},
+                {"$set": {"is_active": False}, "$inc": {"version": 1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if other_match is not None:
+                deactivated.append(other_match)
         
         # Activate the specified match and set to live
-        result = await matches_collection.update_one(
+        update_data = {
+            "is_active": True,
+            "status": "live",
+            "updated_at": datetime.utcnow()
+        }
+        active_match = await matches_collection.find_one_and_update(
             {"_id": match_id},
-            {
-                "$set": {
-                    "is_active": True,
-                    "status": "live",
-                    "updated_at": datetime.utcnow()
-                }
-            }
+            {"$set": update_data, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
-            return web.json_response({
-                "success": False,
-                "message": "Match not found"
-            }, status=404)
-        
-        active_match = await matches_collection.find_one({"_id": match_id})
         if active_match is None:
             return web.json_response({
                 "success": False,
-                "message": "Match not found after activation"
+                "message": "Match not found"
             }, status=404)
             
         active_match['_id'] = str(active_match['_id'])
         
         active_match = serialize_datetime(active_match)
         
-        await broadcast_sse_event("active_match_changed", active_match)
+        for other_match in deactivated:
+            await emit_db_event("match_updated", build_match_delta(other_match, {"is_active": False}))
+        await emit_db_event("active_match_changed", build_match_delta(active_match, update_data))
         
         logger.info(f"Match {match_id_str} set as active")
         
@@ -1156,12 +2441,11 @@ async def set_match_winner(request: web.Request) -> web.Response:
             "updated_at": datetime.utcnow()
         }
         
-        await matches_collection.update_one(
+        updated_match = await matches_collection.find_one_and_update(
             {"_id": match_id},
-            {"$set": update_data}
+            {"$set": update_data, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
         )
-        
-        updated_match = await matches_collection.find_one({"_id": match_id})
         if updated_match is None:
             return web.json_response({
                 "success": False,
@@ -1172,7 +2456,7 @@ async def set_match_winner(request: web.Request) -> web.Response:
         
         updated_match = serialize_datetime(updated_match)
         
-        await broadcast_sse_event("match_completed", updated_match)
+        await emit_db_event("match_completed", build_match_delta(updated_match, update_data))
         
         logger.info(f"Match {match_id_str} completed - Winner: {winner_name}")
         
@@ -1338,57 +2622,850 @@ async def advance_team_to_round(request: web.Request) -> web.Response:
         }, status=500)
 
 
-# ============================================================================
-# LIVE STREAMING ENDPOINTS
-# ============================================================================
+# ============================================================================
+# LIVE STREAMING ENDPOINTS
+# ============================================================================
+
+class TeamState:
+    """One side of the scoreboard"""
+    __slots__ = ("name", "score", "subtitle")
+
+    def __init__(self, name: str, score: int, subtitle: str):
+        self.name = name
+        self.score = score
+        self.subtitle = subtitle
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "score": self.score, "subtitle": self.subtitle}
+
+    def update(self, data: Dict):
+        for field in self.__slots__:
+            if field in data:
+                setattr(self, field, data[field])
+
+
+def server_time_ms() -> int:
+    """Wall-clock time in ms; clients line their clocks up with it via /api/time"""
+    return int(time.time() * 1000)
+
+
+class MatchClock:
+    """
+    Round timer owned by the server. Only changes are broadcast, as an
+    anchor: while running, viewers show elapsedMs + (now - anchorMs) using
+    their offset from /api/time, so no per-second events are needed. With
+    durationMs set it is shown as a countdown.
+    """
+    __slots__ = ("running", "elapsedMs", "anchorMs", "durationMs")
+
+    def __init__(self):
+        self.running = False
+        self.elapsedMs = 0  # Time run before anchorMs
+        self.anchorMs: Optional[int] = None  # Server time the clock last started running
+        self.durationMs: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def update(self, data: Dict):
+        for field in self.__slots__:
+            if field in data:
+                setattr(self, field, data[field])
+
+    def elapsed(self, now_ms: int) -> int:
+        return self.elapsedMs + (now_ms - self.anchorMs if self.running else 0)
+
+    def start(self, now_ms: int, duration_ms: Optional[int] = None):
+        self.running = True
+        self.elapsedMs = 0
+        self.anchorMs = now_ms
+        self.durationMs = duration_ms
+
+    def pause(self, now_ms: int):
+        if self.running:
+            self.elapsedMs = self.elapsed(now_ms)
+            self.running = False
+            self.anchorMs = None
+
+    def resume(self, now_ms: int):
+        if not self.running:
+            self.running = True
+            self.anchorMs = now_ms
+
+    def adjust(self, now_ms: int, delta_ms: int) -> int:
+        """
+        Move the clock by delta_ms of elapsed time (negative gives a countdown
+        more time). Elapsed time cannot go below zero, so the change actually
+        made is returned; it is smaller than asked when that limit is hit.
+        """
+        if self.running:
+            # Re-anchor so the change is one absolute value rather than a drifting offset
+            self.elapsedMs = self.elapsed(now_ms)
+            self.anchorMs = now_ms
+        before = self.elapsedMs
+        self.elapsedMs = max(0, self.elapsedMs + delta_ms)
+        return self.elapsedMs - before
+
+    def reset(self):
+        self.running = False
+        self.elapsedMs = 0
+        self.anchorMs = None
+        self.durationMs = None
+
+
+class StreamState:
+    """
+    Overlay state for the live stream. Handlers change the fields and then
+    call StreamChannel.bump_version(), which drops the cached JSON encoding; until
+    then every read, snapshot and reply reuses the same encoded string.
+    """
+    __slots__ = (
+        "team1", "team2", "map", "round", "bestOf", "matchTitle",
+        "ingress_server", "paused", "clock", "version", "_encoded"
+    )
+    FIELDS = ("map", "round", "bestOf", "matchTitle", "ingress_server", "paused", "version")
+
+    def __init__(self, version: int = 0, ingress_server: str = "", paused: bool = False):
+        self.team1 = TeamState("TEAM ALPHA", 0, "Attackers")
+        self.team2 = TeamState("TEAM OMEGA", 0, "Defenders")
+        self.map = "HAVEN"
+        self.round = "1/24"
+        self.bestOf = "BO3"
+        self.matchTitle = "Grand Finals — ASTERISK 2025"
+        self.ingress_server = ingress_server  # HLS stream source URL
+        self.paused = paused  # Whether the pause screen is showing
+        self.clock = MatchClock()
+        self.version = version  # Bumped on every change; viewers use it to detect missed patches
+        self._encoded: Optional[str] = None
+
+    def team(self, number: int) -> TeamState:
+        return self.team1 if number == 1 else self.team2
+
+    def to_dict(self) -> Dict:
+        """A fresh dict of the state, safe for the caller to modify"""
+        state = {"team1": self.team1.to_dict(), "team2": self.team2.to_dict(), "clock": self.clock.to_dict()}
+        for field in self.FIELDS:
+            state[field] = getattr(self, field)
+        return state
+
+    def update(self, data: Dict):
+        """Set the fields present in a (partial) state dict, e.g. a merge patch"""
+        for part in ("team1", "team2", "clock"):
+            if isinstance(data.get(part), dict):
+                getattr(self, part).update(data[part])
+        for field in self.FIELDS:
+            if field in data:
+                setattr(self, field, data[field])
+        self.invalidate()
+
+    def invalidate(self):
+        self._encoded = None
+
+    def encoded(self) -> str:
+        """The state as JSON, encoded once per change"""
+        if self._encoded is None:
+            self._encoded = json.dumps(self.to_dict())
+        return self._encoded
+
+
+# Team standings shown on the pause screen, shared by every channel and kept
+# in memory for connect snapshots
+stream_team_stats: List[Dict] = []
+
+
+class PresenceTracker:
+    """
+    Viewers seen within the last `ttl` seconds, keyed by the viewer's own id
+    so a reconnecting viewer is still counted once. Entries are kept in
+    last-seen order, so a sweep only touches the ones that expired.
+    """
+
+    def __init__(self, ttl: float, max_viewers: int):
+        self.ttl = ttl
+        self.max_viewers = max_viewers
+        self._last_seen: "OrderedDict[str, float]" = OrderedDict()
+        # Open stream connections on this worker per viewer id; only these
+        # viewers may be pinged, so a script cannot invent viewers
+        self._connections: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+    def ping(self, viewer_id: str, now: Optional[float] = None):
+        if viewer_id in self._last_seen:
+            self._last_seen.move_to_end(viewer_id)
+        elif len(self._last_seen) >= self.max_viewers:
+            return
+        self._last_seen[viewer_id] = now if now is not None else time.monotonic()
+
+    def leave(self, viewer_id: str):
+        self._last_seen.pop(viewer_id, None)
+
+    def attach(self, viewer_id: str):
+        self._connections[viewer_id] = self._connections.get(viewer_id, 0) + 1
+
+    def detach(self, viewer_id: str):
+        remaining = self._connections.get(viewer_id, 1) - 1
+        if remaining > 0:
+            self._connections[viewer_id] = remaining
+        else:
+            self._connections.pop(viewer_id, None)
+
+    def is_connected(self, viewer_id: str) -> bool:
+        return viewer_id in self._connections
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop viewers not seen within the TTL; returns how many expired"""
+        cutoff = (now if now is not None else time.monotonic()) - self.ttl
+        expired = 0
+        while self._last_seen:
+            viewer_id, last_seen = next(iter(self._last_seen.items()))
+            if last_seen > cutoff:
+                break
+            self._last_seen.popitem(last=False)
+            expired += 1
+        return expired
+
+
+def clean_viewer_id(value: Any) -> Optional[str]:
+    """Viewer ids come from clients; accept short strings or numbers only"""
+    if isinstance(value, (str, int)) and not isinstance(value, bool):
+        value = str(value).strip()
+        if 0 < len(value) <= 64:
+            return value
+    return None
+
+
+def join_viewer_presence(request: web.Request, channel: "StreamChannel", viewer: SSEClient):
+    """Mark a newly connected stream viewer present, under its own id if it sent one"""
+    viewer.presence_id = clean_viewer_id(request.query.get('viewerId')) or str(id(viewer))
+    channel.presence.attach(viewer.presence_id)
+    channel.presence.ping(viewer.presence_id)
+
+
+def leave_viewer_connection(channel: "StreamChannel", viewer: SSEClient):
+    """Unregister a stream viewer's connection; safe to call more than once"""
+    if viewer in channel.viewers and viewer.presence_id is not None:
+        channel.presence.detach(viewer.presence_id)
+    unregister_sse_client(channel.viewers, viewer)
+
+
+async def viewer_count_ticker():
+    """
+    Background task that publishes the viewer count as a single ring event
+    when it has changed, so a mass disconnect costs one frame per viewer
+    instead of one per disconnect. With a shared backplane it also sends
+    this worker's own count to the others, and the count shown is the sum.
+    """
+    published = {name: 0 for name in stream_channels}
+    published_at = {name: time.monotonic() for name in stream_channels}
+    shared = {name: 0 for name in stream_channels}
+    shared_at = {name: 0.0 for name in stream_channels}
+    while True:
+        await asyncio.sleep(min(1.0, VIEWER_COUNT_INTERVAL))
+        for name, channel in stream_channels.items():
+            channel.presence.sweep()
+            now = time.monotonic()
+            local = len(channel.presence)
+            if event_backplane.name != "memory" and (
+                local != shared[name] or now - shared_at[name] >= VIEWER_COUNT_INTERVAL
+            ):
+                await event_backplane.publish(channel.key, "workerViewerCount", {
+                    "worker": WORKER_ID,
+                    "count": local
+                })
+                shared[name] = local
+                shared_at[name] = now
+            
+            count = channel.viewer_count(now)
+            if count == published[name]:
+                continue
+            
+            significant = abs(count - published[name]) >= max(1, published[name] * VIEWER_COUNT_CHANGE)
+            if significant or now - published_at[name] >= VIEWER_COUNT_INTERVAL:
+                channel.append_event("viewerCount", {"count": count})
+                published[name] = count
+                published_at[name] = now
+
+
+class ChatRateLimiter:
+    """
+    Token bucket per chat sender: `burst` messages up front, refilled at `rate`
+    per second. Buckets are kept in last-used order and the oldest is dropped
+    beyond `max_senders`, so memory stays bounded however many ids are seen.
+    """
+
+    def __init__(self, rate: float, burst: int, max_senders: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_senders = max_senders
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()  # sender -> (tokens, updated)
+
+    def take(self, sender: str, now: Optional[float] = None) -> float:
+        """Spend a token; returns 0 if the message may be sent, else seconds until it may"""
+        if now is None:
+            now = time.monotonic()
+        tokens, updated = self._buckets.pop(sender, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.rate if self.rate > 0 else float(SSE_HEARTBEAT_INTERVAL)
+        self._buckets[sender] = (tokens, now)
+        if len(self._buckets) > self.max_senders:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+chat_limiter = ChatRateLimiter(CHAT_RATE, CHAT_BURST, CHAT_MAX_SENDERS)
+
+
+class StreamChat:
+    """
+    A channel's chat. Messages accepted by this worker are queued and
+    published as one chatBatch event per tick, so fan-out costs one frame
+    per viewer per tick rather than per message, and a chat request never
+    waits on it. Every worker keeps the recent batches as history for
+    viewers that connect later.
+    """
+
+    def __init__(self, key: str, batch_ms: float, batch_max: int, history_size: int):
+        self.key = key
+        self.tick = batch_ms / 1000
+        self.batch_max = batch_max
+        self.history: Deque[Dict] = deque(maxlen=history_size)
+        self._pending: List[Dict] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._encoded_history: Optional[str] = None
+
+    def post(self, username: str, message: str) -> bool:
+        """Queue a message for the next batch; False if this tick's batch is full"""
+        if len(self._pending) >= self.batch_max:
+            return False
+        self._pending.append({
+            "username": username,
+            "message": message,
+            "timestamp": server_time_ms()
+        })
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_later())
+        return True
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.tick)
+        await self.flush()
+
+    async def flush(self):
+        self._flusher = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        SSE_STATS["chat_batches"] += 1
+        await stream_coalescer.submit(self.key, "chatBatch", {"messages": batch})
+
+    def remember(self, messages: List[Dict]):
+        """Record a delivered batch in the history"""
+        self.history.extend(messages)
+        self._encoded_history = None
+
+    def encoded_history(self) -> Optional[str]:
+        """The history as chatHistory event data, encoded once per change; None if empty"""
+        if not self.history:
+            return None
+        if self._encoded_history is None:
+            self._encoded_history = json.dumps({"messages": list(self.history)}, separators=(',', ':'))
+        return self._encoded_history
+
+
+# Events that only report a change to the overlay state. They are merged and
+# sent as a versioned state_patch; anything else (matchStart, showPause,
+# chat...) is a one-shot cue and is sent as-is
+COALESCED_STREAM_EVENTS = {"score_updated", "teams_updated", "match_info_updated", "overlay_updated"}
+
+
+class StreamEventCoalescer:
+    """
+    Merges bursts of overlay state changes into a single state_patch per
+    tick, carrying only the fields that changed since the last patch. A cue
+    flushes pending state first so viewers see events in order.
+    """
+
+    def __init__(self, tick_ms: float):
+        self.tick = tick_ms / 1000
+        self._pending: Dict[str, List[str]] = {}
+        self._created: Dict[str, float] = {}  # When the oldest pending change was made
+        self._flushers: Dict[str, asyncio.Task] = {}
+        self._published: Dict[str, Dict] = {}  # State as of the last patch sent on each channel
+
+    def set_baseline(self, channel: str, state: Dict):
+        """Set the state viewers are known to have, which the next patch is diffed against"""
+        self._published[channel] = copy.deepcopy(state)
+
+    async def submit(self, channel: str, event_type: str, data: Dict, created_at: Optional[float] = None):
+        if created_at is None:
+            created_at = time.monotonic()
+        if event_type in COALESCED_STREAM_EVENTS:
+            await self.submit_state(channel, event_type, created_at)
+            return
+        
+        await self.flush(channel)
+        await event_backplane.publish(channel, event_type, data, created_at)
+
+    async def submit_state(self, channel: str, cause: str, created_at: Optional[float] = None):
+        """Queue a state change on a channel to go out with the next patch"""
+        self._pending.setdefault(channel, []).append(cause)
+        self._created.setdefault(channel, created_at if created_at is not None else time.monotonic())
+        if self.tick <= 0:
+            await self.flush(channel)
+        elif channel not in self._flushers:
+            self._flushers[channel] = asyncio.create_task(self._flush_later(channel))
+
+    async def _flush_later(self, channel: str):
+        await asyncio.sleep(self.tick)
+        await self.flush(channel)
+
+    async def flush(self, channel: str):
+        """Publish one patch covering every state change pending on a channel"""
+        flusher = self._flushers.pop(channel, None)
+        if flusher is not None and flusher is not asyncio.current_task():
+            flusher.cancel()
+        
+        pending = self._pending.pop(channel, None)
+        created_at = self._created.pop(channel, None)
+        if not pending:
+            return
+        SSE_STATS["coalesced_events"] += len(pending) - 1
+        
+        # Diff against what viewers last saw; the state may have been replaced since
+        published = self._published.get(channel, {})
+        state = find_stream_channel(channel).state.to_dict()
+        patch = make_merge_patch(published, state)
+        patch.pop("version", None)
+        self.set_baseline(channel, state)
+        if not patch and published.get("version") == state["version"]:
+            return  # An empty patch still goes out if the version moved, to keep viewers in step
+        
+        await event_backplane.publish(channel, "state_patch", {
+            "base": published.get("version", 0),
+            "version": state["version"],
+            "patch": patch,
+            "causes": sorted(set(pending))
+        }, created_at)
+
+
+stream_coalescer = StreamEventCoalescer(STREAM_COALESCE_MS)
+
+
+class StreamStateJournal:
+    """
+    Write-behind persistence for one channel's overlay state. Requests only bump the
+    version; a background task diffs the state against what was last
+    written and appends one merge patch per interval, so a burst of score
+    updates costs one row. Restoring replays the journal over the snapshot.
+    """
+
+    def __init__(self, path: str, channel: str, snapshot_every: int):
+        self.path = path
+        self.channel = channel
+        self.snapshot_every = snapshot_every
+        self._persisted: Dict = {}  # State as of the last write
+        self._entries = 0  # Journal rows since the last snapshot
+
+    def init(self):
+        conn = sqlite3.connect(self.path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stream_snapshots (
+                channel TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stream_journal (
+                channel TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                patch TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (channel, version)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def load(self) -> Optional[Dict]:
+        """The last persisted state (snapshot plus journal), or None if nothing was saved"""
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.cursor()
+            row = cursor.execute(
+                "SELECT version, state FROM stream_snapshots WHERE channel = ?", (self.channel,)
+            ).fetchone()
+            base_version, state = (row[0], json.loads(row[1])) if row else (-1, None)
+            patches = cursor.execute(
+                "SELECT patch FROM stream_journal WHERE channel = ? AND version > ? ORDER BY version",
+                (self.channel, base_version)
+            ).fetchall()
+        finally:
+            conn.close()
+        
+        for (patch,) in patches:
+            state = apply_merge_patch(state if state is not None else {}, json.loads(patch))
+        self._entries = len(patches)
+        if state is not None:
+            self._persisted = copy.deepcopy(state)
+        return state
+
+    def _write(self, version: int, patch: Dict, snapshot: Optional[Dict]):
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO stream_journal (channel, version, patch) VALUES (?, ?, ?)",
+                (self.channel, version, json.dumps(patch))
+            )
+            if snapshot is not None:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO stream_snapshots (channel, version, state) VALUES (?, ?, ?)",
+                    (self.channel, version, json.dumps(snapshot))
+                )
+                cursor.execute(
+                    "DELETE FROM stream_journal WHERE channel = ? AND version <= ?", (self.channel, version)
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    async def flush(self, current: StreamState):
+        """Persist the state if it changed since the last write"""
+        if self._persisted.get("version") == current.version:
+            return
+        state = current.to_dict()
+        patch = make_merge_patch(self._persisted, state)
+        self._entries += 1
+        snapshot = state if self._entries >= self.snapshot_every else None
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, self._write, state["version"], patch, snapshot)
+        except Exception as e:
+            self._entries -= 1
+            logger.error(f"Stream state journal write error: {e}")
+            return
+        self._persisted = state
+        if snapshot is not None:
+            self._entries = 0
+
+class StreamChannel:
+    """
+    One live stream, e.g. a court: its overlay state, viewers, event ring,
+    presence and journal. Events on a channel only wake that channel's
+    viewers, so parallel matches do not pay for each other's fan-out.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.key = f"stream:{name}"  # Backplane and coalescer channel
+        self.state = StreamState()
+        self.viewers: Set[SSEClient] = set()
+        self.ring = EventRing(self.key, SSE_RING_SIZE)
+        self.presence = PresenceTracker(PRESENCE_TTL, PRESENCE_MAX_VIEWERS)
+        self.journal = StreamStateJournal(STATE_JOURNAL_DB, name, STATE_SNAPSHOT_EVERY)
+        self.chat = StreamChat(self.key, CHAT_BATCH_MS, CHAT_BATCH_MAX, CHAT_HISTORY_SIZE)
+        # Other workers' viewer counts: worker id -> (count, monotonic time received)
+        self.worker_counts: Dict[str, tuple] = {}
+        # Long-polling /api/match-state requests wait on this; it is set and
+        # replaced on every change to the state
+        self.state_changed = asyncio.Event()
+        # Encoded snapshot and state shared by every request at the same version;
+        # the snapshot is also cleared when team stats change
+        self.snapshot_cache: Dict[int, tuple] = {}
+        self.state_cache: Dict[int, tuple] = {}
+
+    def viewer_count(self, now: Optional[float] = None) -> int:
+        """Viewers present on this worker plus those last reported by the other workers"""
+        cutoff = (now if now is not None else time.monotonic()) - VIEWER_COUNT_STALE
+        for worker, (_, received) in list(self.worker_counts.items()):
+            if received < cutoff:
+                del self.worker_counts[worker]
+        return len(self.presence) + sum(count for count, _ in self.worker_counts.values())
+
+    def notify_state_changed(self):
+        """Wake every request parked on the current version"""
+        self.state_changed.set()
+        self.state_changed = asyncio.Event()
+
+    def bump_version(self, version: Optional[int] = None) -> int:
+        """
+        Record a mutation of the state; call after every change to it, with
+        the version claimed for it by claim_stream_version
+        """
+        self.state.version = version if version is not None else self.state.version + 1
+        self.state.invalidate()
+        self.notify_state_changed()
+        return self.state.version
+
+    def reset_state(self, version: Optional[int] = None):
+        """Replace the overlay with the defaults, keeping the stream source and pause screen"""
+        self.state = StreamState(
+            version=version if version is not None else self.state.version + 1,
+            ingress_server=self.state.ingress_server,
+            paused=self.state.paused
+        )
+        self.notify_state_changed()
+
+    def append_event(self, event_type: str, data: Dict, created_at: Optional[float] = None) -> int:
+        """Append a live stream event, encoding its data once for both SSE and WebSocket viewers"""
+        payload = json.dumps(data, separators=(',', ':'))
+        return self.ring.append(
+            f'event: {event_type}\ndata: {payload}',
+            compact=f'"{event_type}",{payload}',
+            bulk=event_type in BULK_STREAM_EVENTS,
+            event_type=event_type,
+            created_at=created_at
+        )
 
-# Store live stream state
-stream_state = {
-    "team1": {
-        "name": "TEAM ALPHA",
-        "score": 0,
-        "subtitle": "Attackers"
-    },
-    "team2": {
-        "name": "TEAM OMEGA",
-        "score": 0,
-        "subtitle": "Defenders"
-    },
-    "map": "HAVEN",
-    "round": "1/24",
-    "bestOf": "BO3",
-    "matchTitle": "Grand Finals — ASTERISK 2025",
-    "ingress_server": ""  # HLS stream source URL
-}
+    def encoded_snapshot(self) -> tuple:
+        """
+        Everything a viewer needs on connect, as a JSON string and as an SSE
+        frame, encoded once per version; later events are relative to it.
+        """
+        version = self.state.version
+        cached = self.snapshot_cache.get(version)
+        if cached is None:
+            self.snapshot_cache.clear()
+            payload = (
+                f'{{"version":{version},"state":{self.state.encoded()},'
+                f'"teamStats":{json.dumps(stream_team_stats, separators=(",", ":"))}}}'
+            )
+            cached = self.snapshot_cache[version] = (
+                payload, f'event: state_snapshot\ndata: {payload}\n\n'.encode('utf-8')
+            )
+        return cached
+
+    def encoded_state(self) -> tuple:
+        """(body, etag) for the current state version"""
+        version = self.state.version
+        cached = self.state_cache.get(version)
+        if cached is None:
+            self.state_cache.clear()
+            # The ring epoch keeps ETags from one process run from matching the next
+            cached = self.state_cache[version] = (
+                self.state.encoded().encode('utf-8'), f'"{self.ring.epoch}-{self.name}-{version}"'
+            )
+        return cached
 
-# Store viewer count (SSE clients for streaming)
-stream_viewers = []
 
+stream_channels: Dict[str, StreamChannel] = {name: StreamChannel(name) for name in STREAM_CHANNELS}
+for _channel in stream_channels.values():
+    stream_coalescer.set_baseline(_channel.key, _channel.state.to_dict())
 
-async def broadcast_stream_event(event_type: str, data: Dict):
-    """Broadcast event to all stream viewers via SSE"""
-    if not stream_viewers:
-        return
+
+def find_stream_channel(key: str) -> Optional[StreamChannel]:
+    """The channel for a backplane key such as 'stream:A'"""
+    prefix, _, name = key.partition(":")
+    return stream_channels.get(name) if prefix == "stream" else None
+
+
+def get_stream_channel(request: web.Request) -> Optional[StreamChannel]:
+    """The channel a request is for: {channel} in the path or ?channel=, else the default one"""
+    name = request.match_info.get("channel") or request.query.get("channel") or DEFAULT_STREAM_CHANNEL
+    return stream_channels.get(name)
+
+
+def unknown_stream_channel() -> web.Response:
+    return web.json_response({
+        "success": False,
+        "message": "Unknown stream channel"
+    }, status=404)
+
+
+def count_stream_viewers() -> int:
+    return sum(len(channel.viewers) for channel in stream_channels.values())
+
+
+def wake_all_rings():
+    sse_event_ring.wake()
+    for channel in stream_channels.values():
+        channel.ring.wake()
+
+
+async def stream_journal_loop(interval: float):
+    """Background task that persists every channel's overlay state"""
+    await asyncio.get_event_loop().run_in_executor(None, next(iter(stream_channels.values())).journal.init)
+    while True:
+        await asyncio.sleep(interval)
+        await flush_stream_journals()
+
+
+async def flush_stream_journals():
+    for channel in stream_channels.values():
+        await channel.journal.flush(channel.state)
+
+
+def restore_stream_state() -> int:
+    """Load every channel's journalled overlay state on startup, so a restart keeps the scoreboards"""
+    restored = 0
+    for channel in stream_channels.values():
+        channel.journal.init()
+        state = channel.journal.load()
+        if state:
+            channel.state.update(state)
+            stream_coalescer.set_baseline(channel.key, channel.state.to_dict())
+            restored += 1
+    return restored
+
+
+def stream_version_key(channel: StreamChannel) -> str:
+    """db.config key holding a channel's shared state version"""
+    return f"stream_version:{channel.name}"
+
+
+async def sync_stream_versions():
+    """Make sure the shared version counter of every channel is at least this worker's version"""
+    for channel in stream_channels.values():
+        await db.config.update_one(
+            {"key": stream_version_key(channel)},
+            {"$max": {"version": channel.state.version}},
+            upsert=True
+        )
+
+
+async def claim_stream_version(channel: StreamChannel, expected: Optional[int] = None) -> Optional[int]:
+    """
+    Reserve the version for a change to a channel's state, to be applied with
+    no await in between. Returns None if the state has moved past `expected`
+    or the version could not be claimed.
     
-    event_message = f'event: {event_type}\ndata: {json.dumps(data)}'
+    With a shared backplane the counter lives in db.config and is advanced
+    with a compare-and-set from the version this worker holds, so two
+    workers can never both build on the same version. A worker that is
+    behind waits for the missing patch and tries again.
+    """
+    if event_backplane.name == "memory":
+        if expected is not None and expected != channel.state.version:
+            return None
+        return channel.state.version + 1
     
-    for viewer_queue in stream_viewers[:]:  # Copy list to avoid modification during iteration
+    for _ in range(STREAM_CLAIM_ATTEMPTS):
+        current = channel.state.version
+        if expected is not None and expected < current:
+            return None
+        if expected is None or expected == current:
+            claimed = await db.config.find_one_and_update(
+                {"key": stream_version_key(channel), "version": current},
+                {"$inc": {"version": 1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if claimed is not None:
+                return claimed["version"]
+        
+        # Another worker got there first; wait for its patch before retrying
+        changed = channel.state_changed
         try:
-            await viewer_queue.put(event_message)
-        except Exception as e:
-            logger.error(f"Error broadcasting to stream viewer: {e}")
-            try:
-                stream_viewers.remove(viewer_queue)
-            except ValueError:
-                pass
+            await asyncio.wait_for(changed.wait(), STREAM_CLAIM_WAIT)
+        except asyncio.TimeoutError:
+            # No patch came, so the claimant may have exited before sending it;
+            # catch up with the counter rather than stay behind it for good
+            shared = await db.config.find_one({"key": stream_version_key(channel)})
+            if shared is not None and shared.get("version", 0) > channel.state.version:
+                channel.bump_version(shared["version"])
+                await stream_coalescer.submit_state(channel.key, "version_synced")
+    return None
+
+
+def stream_conflict(channel: StreamChannel) -> web.Response:
+    return stream_state_response(
+        channel, 409, success=False, message="Overlay was changed by someone else", version=channel.state.version
+    )
+
+
+async def set_stream_paused(channel: StreamChannel, paused: bool) -> bool:
+    """
+    Record the pause screen state so it reaches viewers in patches and
+    snapshots; False if the version could not be claimed
+    """
+    if channel.state.paused == paused:
+        return True
+    version = await claim_stream_version(channel)
+    if version is None:
+        return False
+    channel.state.paused = paused
+    channel.bump_version(version)
+    await stream_coalescer.submit_state(channel.key, "pause_changed")
+    return True
+
+
+async def broadcast_team_stats():
+    """Send the full team stats table to live viewers"""
+    if SSE_EVENT_SOURCE == "change_streams":
+        return  # Every worker refreshes from the change stream instead
+    query_cache.invalidate()
+    teams = await query_cache.get("team_stats", load_team_stats)
+    for channel in stream_channels.values():
+        await broadcast_stream_event(channel, "teamStats", {"teams": teams})
+
+
+async def refresh_local_team_stats():
+    """Reload team stats after a change stream event and send them to this worker's viewers"""
+    try:
+        teams = await query_cache.get("team_stats", load_team_stats)
+    except Exception as e:
+        logger.error(f"Refresh team stats error: {e}")
+        return
+    for channel in stream_channels.values():
+        deliver_local_event(channel.key, "teamStats", {"teams": teams})
+
+
+async def broadcast_stream_event(channel: StreamChannel, event_type: str, data: Dict):
+    """Broadcast event to all viewers of a stream channel"""
+    await stream_coalescer.submit(channel.key, event_type, data, time.monotonic())
     
-    logger.info(f"Broadcasted stream event '{event_type}' to {len(stream_viewers)} viewers")
+    logger.info(f"Broadcasted stream event '{event_type}' to {len(channel.viewers)} viewers on '{channel.name}'")
+
+
+def etag_matches(request: web.Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names this ETag"""
+    header = request.headers.get('If-None-Match', '')
+    return header.strip() == '*' or etag in (tag.strip() for tag in header.split(','))
+
+
+def stream_state_response(channel: StreamChannel, status: int = 200, **fields) -> web.Response:
+    """JSON reply with a channel's overlay state, reusing its cached encoding"""
+    head = json.dumps(fields)[:-1]
+    return web.Response(
+        text=f'{head}{", " if fields else ""}"state": {channel.state.encoded()}}}',
+        content_type='application/json', status=status
+    )
 
 
 async def get_stream_state(request: web.Request) -> web.Response:
-    """Get current stream/match state"""
+    """
+    Get current stream/match state. Sends an ETag and answers 304 when the
+    client already has this version; with ?wait=N an up-to-date client is
+    held until the state changes or N seconds pass.
+    """
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
-        return web.json_response(stream_state)
+        body, etag = channel.encoded_state()
+        if etag_matches(request, etag):
+            try:
+                wait = min(float(request.query.get('wait', 0)), STATE_LONG_POLL_MAX)
+            except ValueError:
+                wait = 0
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(channel.state_changed.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                body, etag = channel.encoded_state()
+        
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request, etag):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='application/json', headers=headers)
     except Exception as e:
         logger.error(f"Get stream state error: {e}")
         return web.json_response({
@@ -1399,22 +3476,28 @@ async def get_stream_state(request: web.Request) -> web.Response:
 
 async def update_stream_score(request: web.Request) -> web.Response:
     """Update team scores"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
         data = await request.json()
         team = data.get("team")
         score = data.get("score")
         
         if team in [1, 2] and score is not None:
-            stream_state[f"team{team}"]["score"] = score
+            version = await claim_stream_version(channel)
+            if version is None:
+                return stream_conflict(channel)
+            channel.state.team(team).score = score
+            channel.bump_version(version)
             
             # Broadcast update to all stream viewers
-            await broadcast_stream_event("score_updated", {
+            await broadcast_stream_event(channel, "score_updated", {
                 "team": team,
-                "score": score,
-                "state": stream_state
+                "score": score
             })
             
-            return web.json_response({"success": True, "state": stream_state})
+            return stream_state_response(channel, success=True)
         
         return web.json_response({
             "success": False,
@@ -1430,25 +3513,33 @@ async def update_stream_score(request: web.Request) -> web.Response:
 
 async def update_stream_teams(request: web.Request) -> web.Response:
     """Update team names and info"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
         data = await request.json()
         
+        version = await claim_stream_version(channel)
+        if version is None:
+            return stream_conflict(channel)
         if "team1" in data:
             if "name" in data["team1"]:
-                stream_state["team1"]["name"] = data["team1"]["name"]
+                channel.state.team1.name = data["team1"]["name"]
             if "subtitle" in data["team1"]:
-                stream_state["team1"]["subtitle"] = data["team1"]["subtitle"]
+                channel.state.team1.subtitle = data["team1"]["subtitle"]
         
         if "team2" in data:
             if "name" in data["team2"]:
-                stream_state["team2"]["name"] = data["team2"]["name"]
+                channel.state.team2.name = data["team2"]["name"]
             if "subtitle" in data["team2"]:
-                stream_state["team2"]["subtitle"] = data["team2"]["subtitle"]
+                channel.state.team2.subtitle = data["team2"]["subtitle"]
+        
+        channel.bump_version(version)
         
         # Broadcast update to all stream viewers
-        await broadcast_stream_event("teams_updated", {"state": stream_state})
+        await broadcast_stream_event(channel, "teams_updated", {})
         
-        return web.json_response({"success": True, "state": stream_state})
+        return stream_state_response(channel, success=True)
     except Exception as e:
         logger.error(f"Update stream teams error: {e}")
         return web.json_response({
@@ -1459,22 +3550,30 @@ async def update_stream_teams(request: web.Request) -> web.Response:
 
 async def update_stream_match_info(request: web.Request) -> web.Response:
     """Update match information"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
         data = await request.json()
         
+        version = await claim_stream_version(channel)
+        if version is None:
+            return stream_conflict(channel)
         if "map" in data:
-            stream_state["map"] = data["map"]
+            channel.state.map = data["map"]
         if "round" in data:
-            stream_state["round"] = data["round"]
+            channel.state.round = data["round"]
         if "bestOf" in data:
-            stream_state["bestOf"] = data["bestOf"]
+            channel.state.bestOf = data["bestOf"]
         if "matchTitle" in data:
-            stream_state["matchTitle"] = data["matchTitle"]
+            channel.state.matchTitle = data["matchTitle"]
+        
+        channel.bump_version(version)
         
         # Broadcast update to all stream viewers
-        await broadcast_stream_event("match_info_updated", {"state": stream_state})
+        await broadcast_stream_event(channel, "match_info_updated", {})
         
-        return web.json_response({"success": True, "state": stream_state})
+        return stream_state_response(channel, success=True)
     except Exception as e:
         logger.error(f"Update stream match info error: {e}")
         return web.json_response({
@@ -1483,52 +3582,180 @@ async def update_stream_match_info(request: web.Request) -> web.Response:
         }, status=400)
 
 
+# Fields /api/update-overlay may set, with the type each must have
+OVERLAY_TEAM_FIELDS = {"name": str, "subtitle": str, "score": int}
+OVERLAY_MATCH_FIELDS = {"map": str, "round": str, "bestOf": str, "matchTitle": str}
+
+
+def validate_overlay_changes(changes: Any) -> Optional[str]:
+    """Check a batch of overlay changes; returns an error message or None"""
+    if not isinstance(changes, dict) or not changes:
+        return "changes must be a non-empty object"
+    for key, value in changes.items():
+        if key in ("team1", "team2"):
+            if not isinstance(value, dict):
+                return f"{key} must be an object"
+            fields = value.items()
+            allowed = OVERLAY_TEAM_FIELDS
+        elif key in OVERLAY_MATCH_FIELDS:
+            fields = [(key, value)]
+            allowed = OVERLAY_MATCH_FIELDS
+        else:
+            return f"Unknown field: {key}"
+        for field, field_value in fields:
+            expected = allowed.get(field)
+            if expected is None:
+                return f"Unknown field: {key}.{field}"
+            if not isinstance(field_value, expected) or isinstance(field_value, bool):
+                return f"{field} must be {'a number' if expected is int else 'text'}"
+    return None
+
+
+async def update_stream_overlay(request: web.Request) -> web.Response:
+    """
+    Apply a batch of overlay changes at once:
+    {"expectedVersion": 12, "changes": {"team1": {"score": 3}, "map": "BIND"}}.
+    Rejected with 409 if the overlay moved past expectedVersion, so two
+    operators cannot overwrite each other; viewers get a single patch.
+    """
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    try:
+        data = await request.json()
+    except ValueError:
+        return web.json_response({
+            "success": False,
+            "message": "Invalid JSON"
+        }, status=400)
+    
+    changes = data.get("changes") if isinstance(data, dict) else None
+    error = validate_overlay_changes(changes)
+    if error:
+        return web.json_response({
+            "success": False,
+            "message": error
+        }, status=400)
+    
+    expected_version = data.get("expectedVersion")
+    if expected_version is not None and (not isinstance(expected_version, int) or isinstance(expected_version, bool)):
+        return web.json_response({
+            "success": False,
+            "message": "expectedVersion must be a number"
+        }, status=400)
+    version = await claim_stream_version(channel, expected_version)
+    if version is None:
+        return stream_conflict(channel)
+    
+    # No await between claiming the version and the writes, so the batch lands whole
+    channel.state.update(changes)
+    channel.bump_version(version)
+    
+    await broadcast_stream_event(channel, "overlay_updated", {})
+    
+    return stream_state_response(channel, success=True, version=version)
+
+
+CLOCK_ACTIONS = {"start", "pause", "resume", "adjust", "reset"}
+
+
+async def update_match_clock(request: web.Request) -> web.Response:
+    """
+    Control a channel's match clock: {"action": "start", "durationMs": 100000},
+    "pause", "resume", {"action": "adjust", "deltaMs": -5000} or "reset".
+    Viewers get the new anchor in one state patch.
+    """
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    action = data.get("action") if isinstance(data, dict) else None
+    if action not in CLOCK_ACTIONS:
+        return web.json_response({
+            "success": False,
+            "message": f"action must be one of: {', '.join(sorted(CLOCK_ACTIONS))}"
+        }, status=400)
+    
+    amount = data.get("durationMs" if action == "start" else "deltaMs")
+    if (amount is not None or action == "adjust") and (not isinstance(amount, int) or isinstance(amount, bool)):
+        return web.json_response({
+            "success": False,
+            "message": "durationMs / deltaMs must be a whole number of milliseconds"
+        }, status=400)
+    
+    version = await claim_stream_version(channel)
+    if version is None:
+        return stream_conflict(channel)
+    clock = channel.state.clock
+    now_ms = server_time_ms()
+    fields = {}
+    if action == "start":
+        clock.start(now_ms, amount)
+    elif action == "pause":
+        clock.pause(now_ms)
+    elif action == "resume":
+        clock.resume(now_ms)
+    elif action == "adjust":
+        fields["appliedDeltaMs"] = clock.adjust(now_ms, amount)
+    else:
+        clock.reset()
+    channel.bump_version(version)
+    await stream_coalescer.submit_state(channel.key, f"clock_{action}")
+    
+    return stream_state_response(channel, success=True, serverTime=now_ms, **fields)
+
+
+async def get_server_time(request: web.Request) -> web.Response:
+    """Current server time in ms, for clients to work out their clock offset"""
+    return web.Response(
+        text=f'{{"serverTime":{server_time_ms()}}}',
+        content_type='application/json', headers={'Cache-Control': 'no-store'}
+    )
+
+
 async def reset_stream_match(request: web.Request) -> web.Response:
     """Reset stream match to initial state"""
-    global stream_state
-    stream_state = {
-        "team1": {
-            "name": "TEAM ALPHA",
-            "score": 0,
-            "subtitle": "Attackers"
-        },
-        "team2": {
-            "name": "TEAM OMEGA",
-            "score": 0,
-            "subtitle": "Defenders"
-        },
-        "map": "HAVEN",
-        "round": "1/24",
-        "bestOf": "BO3",
-        "matchTitle": "Grand Finals — ASTERISK 2025",
-        "ingress_server": stream_state.get("ingress_server", "")  # Keep ingress server
-    }
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    version = await claim_stream_version(channel)
+    if version is None:
+        return stream_conflict(channel)
+    channel.reset_state(version)
     
-    # Broadcast update to all stream viewers
-    await broadcast_stream_event("match_reset", {"state": stream_state})
+    # Send the reset state as a patch, then the reset cue itself
+    await stream_coalescer.submit_state(channel.key, "match_reset")
+    await broadcast_stream_event(channel, "match_reset", {"version": channel.state.version})
     
-    return web.json_response({"success": True, "state": stream_state})
+    return stream_state_response(channel, success=True)
 
 
 async def trigger_match_start(request: web.Request) -> web.Response:
     """Trigger match start animation for all viewers"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
         team1_data = {
-            "name": stream_state["team1"]["name"],
-            "subtitle": stream_state["team1"]["subtitle"],
+            "name": channel.state.team1.name,
+            "subtitle": channel.state.team1.subtitle,
             "icon": "game-icons:fire-shield"
         }
         
         team2_data = {
-            "name": stream_state["team2"]["name"],
-            "subtitle": stream_state["team2"]["subtitle"],
+            "name": channel.state.team2.name,
+            "subtitle": channel.state.team2.subtitle,
             "icon": "game-icons:lightning-shield"
         }
         
-        # Broadcast to all stream viewers
-        await broadcast_stream_event("matchStart", {
+        # Broadcast to all stream viewers, with the server time the countdown ends
+        await broadcast_stream_event(channel, "matchStart", {
             "team1": team1_data,
-            "team2": team2_data
+            "team2": team2_data,
+            "startsAt": server_time_ms() + MATCH_START_COUNTDOWN_MS
         })
         
         return web.json_response({
@@ -1545,26 +3772,29 @@ async def trigger_match_start(request: web.Request) -> web.Response:
 
 async def trigger_match_end(request: web.Request) -> web.Response:
     """Trigger match ended overlay for all viewers"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
         data = await request.json() if request.can_read_body else {}
         winner = data.get("winner") if data else None
         
         team1_data = {
-            "name": stream_state["team1"]["name"],
-            "score": stream_state["team1"]["score"]
+            "name": channel.state.team1.name,
+            "score": channel.state.team1.score
         }
         
         team2_data = {
-            "name": stream_state["team2"]["name"],
-            "score": stream_state["team2"]["score"]
+            "name": channel.state.team2.name,
+            "score": channel.state.team2.score
         }
         
         # Broadcast to all stream viewers
-        await broadcast_stream_event("matchEnd", {
+        await broadcast_stream_event(channel, "matchEnd", {
             "team1": team1_data,
             "team2": team2_data,
             "winner": winner,
-            "matchTitle": stream_state["matchTitle"]
+            "matchTitle": channel.state.matchTitle
         })
         
         return web.json_response({
@@ -1581,9 +3811,15 @@ async def trigger_match_end(request: web.Request) -> web.Response:
 
 async def show_pause_screen(request: web.Request) -> web.Response:
     """Show pause screen to all viewers"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
+        if not await set_stream_paused(channel, True):
+            return stream_conflict(channel)
+        
         # Broadcast to all stream viewers
-        await broadcast_stream_event("showPause", {
+        await broadcast_stream_event(channel, "showPause", {
             "action": "show",
             "timestamp": datetime.utcnow().isoformat()
         })
@@ -1604,9 +3840,15 @@ async def show_pause_screen(request: web.Request) -> web.Response:
 
 async def hide_pause_screen(request: web.Request) -> web.Response:
     """Hide pause screen from all viewers"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
+        if not await set_stream_paused(channel, False):
+            return stream_conflict(channel)
+        
         # Broadcast to all stream viewers
-        await broadcast_stream_event("hidePause", {
+        await broadcast_stream_event(channel, "hidePause", {
             "action": "hide",
             "timestamp": datetime.utcnow().isoformat()
         })
@@ -1627,72 +3869,182 @@ async def hide_pause_screen(request: web.Request) -> web.Response:
 
 async def stream_sse_handler(request: web.Request) -> web.StreamResponse:
     """SSE endpoint for live stream viewers"""
-    response = web.StreamResponse()
-    response.headers['Content-Type'] = 'text/event-stream'
-    response.headers['Cache-Control'] = 'no-cache'
-    response.headers['Connection'] = 'keep-alive'
-    response.headers['X-Accel-Buffering'] = 'no'
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    rejection = reject_sse_client(request)
+    if rejection is not None:
+        return rejection
     
-    await response.prepare(request)
+    response = await prepare_sse_response(request)
     
-    # Create a queue for this viewer
-    viewer_queue = asyncio.Queue()
-    stream_viewers.append(viewer_queue)
-    viewer_id = id(viewer_queue)
+    # Register a cursor into the shared stream event ring for this viewer
+    viewer = open_sse_client(request, response, channel.ring)
+    register_sse_client(channel.viewers, viewer)
+    join_viewer_presence(request, channel, viewer)
+    viewer_id = id(viewer)
     
-    logger.info(f"New stream viewer connected. Total viewers: {len(stream_viewers)}")
+    logger.info(f"New stream viewer connected to '{channel.name}'. Total viewers: {len(channel.viewers)}")
     
     try:
-        # Send initial connection confirmation
-        await response.write(f'event: connected\ndata: {json.dumps({"viewerId": viewer_id})}\n\n'.encode('utf-8'))
-        
-        # Send viewer count
-        await response.write(f'event: viewerCount\ndata: {json.dumps({"count": len(stream_viewers)})}\n\n'.encode('utf-8'))
-        
-        # Keep sending events from the queue
-        while True:
-            event_data = await viewer_queue.get()
-            await response.write(f'{event_data}\n\n'.encode('utf-8'))
+        # Send connection confirmation, viewer count and the full overlay state,
+        # pause status and team stats in one write; later state changes arrive
+        # as patches against its version
+        retry_ms = jittered_retry_ms()
+        frame = (
+            f'retry: {retry_ms}\n'
+            f'event: connected\ndata: {{"viewerId":{viewer_id},"retryMs":{retry_ms}}}\n\n'
+            f'event: viewerCount\ndata: {{"count":{channel.viewer_count()}}}\n\n'
+        ).encode('utf-8') + channel.encoded_snapshot()[1]
+        # Recent chat for new viewers; a resumed one gets the batches it missed from the ring
+        history = None if viewer.resumed else channel.chat.encoded_history()
+        if history:
+            frame += f'event: chatHistory\ndata: {history}\n\n'.encode('utf-8')
+        await write_sse_frame(viewer, frame)
+        
+        # Keep sending events from the ring
+        await pump_sse_events(viewer)
     except asyncio.CancelledError:
         pass
     except Exception as e:
         logger.error(f"Stream SSE error: {e}")
     finally:
-        if viewer_queue in stream_viewers:
-            stream_viewers.remove(viewer_queue)
-        logger.info(f"Stream viewer disconnected. Remaining viewers: {len(stream_viewers)}")
+        leave_viewer_connection(channel, viewer)
+        logger.info(f"Stream viewer disconnected from '{channel.name}'. Remaining viewers: {len(channel.viewers)}")
+    
+    return response
+
+
+async def stream_ws_handler(request: web.Request) -> web.StreamResponse:
+    """
+    WebSocket endpoint for live stream viewers. Downstream messages are JSON
+    arrays of `[id, event, data]` frames from the same ring SSE viewers read;
+    upstream messages are `["chat", text]` or `["ping"]`.
+    """
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    rejection = reject_sse_client(request)
+    if rejection is not None:
+        return rejection
+    
+    ws = web.WebSocketResponse(heartbeat=SSE_HEARTBEAT_INTERVAL, max_msg_size=STREAM_WS_MAX_MESSAGE)
+    await ws.prepare(request)
+    
+    viewer = open_sse_client(request, ws, channel.ring)
+    register_sse_client(channel.viewers, viewer)
+    join_viewer_presence(request, channel, viewer)
+    viewer_id = id(viewer)
+    
+    logger.info(f"New stream viewer connected to '{channel.name}' over WebSocket. Total viewers: {len(channel.viewers)}")
+    
+    pump_task = None
+    try:
+        history = None if viewer.resumed else channel.chat.encoded_history()
+        await ws.send_str(
+            f'[[null,"connected",{{"viewerId":{viewer_id},"retryMs":{jittered_retry_ms()}}}],'
+            f'[null,"viewerCount",{{"count":{channel.viewer_count()}}}],'
+            f'[null,"state_snapshot",{channel.encoded_snapshot()[0]}]'
+            + (f',[null,"chatHistory",{history}]]' if history else ']')
+        )
+        
+        # Events go out from a separate task while this one reads upstream messages
+        def on_pump_done(task: asyncio.Task):
+            # Eviction or a dead socket ends the pump; close so the read loop below exits
+            if not task.cancelled():
+                task.exception()
+                asyncio.ensure_future(ws.close())
+        
+        pump_task = asyncio.create_task(pump_sse_events(viewer))
+        pump_task.add_done_callback(on_pump_done)
         
-        # Broadcast updated viewer count
-        for viewer in stream_viewers:
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
             try:
-                await viewer.put(f'event: viewerCount\ndata: {json.dumps({"count": len(stream_viewers)})}')
-            except:
-                pass
+                kind, *args = json.loads(msg.data)
+            except (ValueError, TypeError):
+                continue
+            
+            if kind == "chat" and args and isinstance(args[0], str) and args[0].strip():
+                message = args[0].strip()
+                if len(message) > CHAT_MAX_LENGTH:
+                    continue
+                # Keyed on this connection, not the presence id the client chose
+                wait = publish_stream_chat(channel, f"conn:{viewer_id}", viewer_id, message)
+                if wait:
+                    await ws.send_str(f'[[null,"chatRejected",{{"retryMs":{math.ceil(wait * 1000)}}}]]')
+            elif kind == "ping":
+                channel.presence.ping(viewer.presence_id)
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"Stream WebSocket error: {e}")
+    finally:
+        if pump_task is not None:
+            pump_task.cancel()
+        leave_viewer_connection(channel, viewer)
+        logger.info(f"Stream viewer disconnected from '{channel.name}'. Remaining viewers: {len(channel.viewers)}")
     
-    return response
+    return ws
+
+
+def publish_stream_chat(channel: StreamChannel, sender: Optional[str], viewer_id: Any, message: str) -> float:
+    """
+    Queue a viewer's chat message for the channel's next batch. `sender` is
+    the rate limit key, or None for admins. Returns 0 if the message was
+    accepted, else the seconds the sender should wait before retrying.
+    """
+    if sender is not None:
+        wait = chat_limiter.take(sender)
+        if wait:
+            SSE_STATS["chat_rate_limited"] += 1
+            return wait
+    
+    if not channel.chat.post(f"Viewer-{str(viewer_id)[:8]}", message):
+        SSE_STATS["chat_rate_limited"] += 1
+        return max(channel.chat.tick, 0.1)
+    SSE_STATS["chat_messages"] += 1
+    return 0.0
 
 
 async def send_stream_chat(request: web.Request) -> web.Response:
     """Handle chat message submission for live stream"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
         data = await request.json()
         message = data.get('message', '').strip()
-        viewer_id = data.get('viewerId', 'Unknown')
+        viewer_id = clean_viewer_id(data.get('viewerId'))
         
         if not message:
             return web.json_response({
                 'status': 'error',
                 'message': 'Empty message'
             }, status=400)
+        if len(message) > CHAT_MAX_LENGTH:
+            return web.json_response({
+                'status': 'error',
+                'message': f'Message is longer than {CHAT_MAX_LENGTH} characters'
+            }, status=400)
         
-        # Broadcast to all viewers
-        username = f"Viewer-{str(viewer_id)[:8]}"
-        
-        for viewer in stream_viewers:
-            try:
-                await viewer.put(f'event: chatMessage\ndata: {json.dumps({"message": message, "username": username, "timestamp": str(id(message))})}')
-            except:
-                pass
+        # Admin broadcasts are not rate limited. Viewers are limited per stream
+        # connection when their presence id belongs to one open here (so a
+        # made-up id buys nothing), otherwise by their unforgeable address
+        if request.headers.get("X-Auth-Token", "") == MASTER_PASSWORD:
+            sender = None
+        elif viewer_id and channel.presence.is_connected(viewer_id):
+            sender = f"presence:{viewer_id}"
+        else:
+            sender = f"ip:{get_limited_client_ip(request)}"
+        wait = publish_stream_chat(channel, sender, viewer_id or "anon", message)
+        if wait:
+            return web.json_response({
+                'status': 'error',
+                'message': 'You are sending messages too quickly',
+                'retryMs': math.ceil(wait * 1000)
+            }, status=429, headers={'Retry-After': str(math.ceil(wait))})
         
         return web.json_response({'status': 'ok'})
     except Exception as e:
@@ -1705,11 +4057,168 @@ async def send_stream_chat(request: web.Request) -> web.Response:
 
 async def get_stream_viewer_count(request: web.Request) -> web.Response:
     """Get current viewer count"""
-    return web.json_response({'count': len(stream_viewers)})
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    return web.json_response({'count': channel.viewer_count(), 'connections': len(channel.viewers)})
+
+
+async def read_viewer_ids(request: web.Request) -> List[str]:
+    """
+    Viewer ids from a presence request: {"viewerId": id}, or for admins a
+    batch as {"viewerIds": [...]}
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        return []
+    if not isinstance(data, dict):
+        return []
+    
+    ids = data.get("viewerIds")
+    if not isinstance(ids, list) or request.headers.get("X-Auth-Token", "") != MASTER_PASSWORD:
+        ids = [data.get("viewerId")]
+    return [viewer_id for viewer_id in map(clean_viewer_id, ids[:PRESENCE_MAX_BATCH]) if viewer_id]
+
+
+async def viewer_ping(request: web.Request) -> web.Response:
+    """Mark viewers with an open stream connection on this worker as present"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    viewer_ids = await read_viewer_ids(request)
+    if not viewer_ids:
+        return web.json_response({
+            "success": False,
+            "message": "viewerId required"
+        }, status=400)
+    
+    # Pings for ids without a connection are ignored rather than refused, so
+    # a page whose stream is reconnecting does not log errors
+    now = time.monotonic()
+    for viewer_id in viewer_ids:
+        if channel.presence.is_connected(viewer_id):
+            channel.presence.ping(viewer_id, now)
+    return web.Response(status=204)
+
+
+async def viewer_disconnect(request: web.Request) -> web.Response:
+    """Remove viewers that are leaving (sent on page unload)"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    for viewer_id in await read_viewer_ids(request):
+        channel.presence.leave(viewer_id)
+    return web.Response(status=204)
+
+
+async def get_sse_stats(request: web.Request) -> web.Response:
+    """Get SSE connection and backpressure counters (admin only)"""
+    auth_header = request.headers.get("X-Auth-Token", "")
+    if auth_header != MASTER_PASSWORD:
+        return web.json_response({
+            "success": False,
+            "message": "Unauthorized"
+        }, status=401)
+    
+    return web.json_response({
+        "success": True,
+        "sse_clients": len(sse_clients),
+        "sse_topic_subscribers": sse_event_ring.subscriber_counts(),
+        "stream_viewers": count_stream_viewers(),
+        "stream_channels": {
+            name: {
+                "viewers": len(channel.viewers),
+                "present_viewers": len(channel.presence),
+                "last_event_id": channel.ring.last_id,
+                "version": channel.state.version
+            }
+            for name, channel in stream_channels.items()
+        },
+        "max_clients": SSE_MAX_CLIENTS,
+        "max_clients_per_ip": SSE_MAX_CLIENTS_PER_IP,
+        "distinct_ips": len(sse_clients_per_ip),
+        "ring_size": SSE_RING_SIZE,
+        "sse_last_event_id": sse_event_ring.last_id,
+        "overflow_policy": SSE_OVERFLOW_POLICY,
+        "compression": get_sse_compression_stats(),
+        "cue_latency": get_cue_latency_stats(),
+        "shed_backlog": SSE_SHED_BACKLOG,
+        **SSE_STATS
+    })
+
+
+async def get_fanout_latency(request: web.Request) -> web.Response:
+    """
+    Broadcast-to-delivery latency histograms per channel and event type
+    (admin only). Pass ?reset=true to start a new measurement window.
+    """
+    auth_header = request.headers.get("X-Auth-Token", "")
+    if auth_header != MASTER_PASSWORD:
+        return web.json_response({
+            "success": False,
+            "message": "Unauthorized"
+        }, status=401)
+    
+    channels: Dict[str, Dict[str, Any]] = {}
+    for (channel, event_type), histogram in sorted(FANOUT_LATENCY.items(), key=lambda item: str(item[0])):
+        channels.setdefault(channel, {})[event_type or "unknown"] = histogram.summary()
+    
+    if request.query.get("reset", "").lower() == "true":
+        FANOUT_LATENCY.clear()
+    
+    return web.json_response({
+        "success": True,
+        "bucket_bounds_ms": [bound * 1000 for bound in LatencyHistogram.BOUNDS],
+        "channels": channels
+    })
+
+
+def get_sse_compression_stats() -> Dict[str, Any]:
+    """Bytes saved by SSE compression, overall and per compressed client"""
+    bytes_in = SSE_STATS["compression_bytes_in"]
+    bytes_out = SSE_STATS["compression_bytes_out"]
+    compressed_clients = SSE_STATS["compressed_clients"]
+    return {
+        "enabled": SSE_COMPRESSION,
+        "active_clients": sum(
+            1 for clients in (sse_clients, *(channel.viewers for channel in stream_channels.values()))
+            for client in clients if client.compressor is not None
+        ),
+        "bytes_saved": bytes_in - bytes_out,
+        "bytes_saved_per_client": (bytes_in - bytes_out) // compressed_clients if compressed_clients else 0,
+        "ratio": round(bytes_out / bytes_in, 3) if bytes_in else None
+    }
+
+
+def ingress_config_key(channel: StreamChannel) -> str:
+    """db.config key for a channel's stream source; the default channel keeps the original key"""
+    return "ingress_server" if channel.name == DEFAULT_STREAM_CHANNEL else f"ingress_server:{channel.name}"
+
+
+async def load_ingress_servers() -> int:
+    """
+    Load every channel's stored stream source on startup, before any viewer
+    connects; returns how many were loaded
+    """
+    channels_by_key = {ingress_config_key(channel): channel for channel in stream_channels.values()}
+    loaded = 0
+    async for config in db.config.find({"key": {"$in": list(channels_by_key)}}):
+        channel = channels_by_key[config["key"]]
+        value = config.get("value", "")
+        if value and value != channel.state.ingress_server:
+            channel.state.ingress_server = value
+            channel.bump_version()
+            stream_coalescer.set_baseline(channel.key, channel.state.to_dict())
+            loaded += 1
+    return loaded
 
 
 async def update_ingress_server(request: web.Request) -> web.Response:
     """Update ingress server URL (admin only)"""
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
     try:
         # Check authentication
         auth_header = request.headers.get("X-Auth-Token", "")
@@ -1729,20 +4238,25 @@ async def update_ingress_server(request: web.Request) -> web.Response:
             }, status=400)
         
         # Update in memory
-        stream_state["ingress_server"] = ingress_url
+        version = await claim_stream_version(channel)
+        if version is None:
+            return stream_conflict(channel)
+        channel.state.ingress_server = ingress_url
+        channel.bump_version(version)
+        await broadcast_stream_event(channel, "match_info_updated", {})
         
         # Store in database for persistence (using global db object)
         try:
             config_collection = db.config
             await config_collection.update_one(
-                {"key": "ingress_server"},
+                {"key": ingress_config_key(channel)},
                 {"$set": {"value": ingress_url, "updated_at": datetime.utcnow()}},
                 upsert=True
             )
         except Exception as db_error:
             logger.warning(f"Failed to save ingress server to DB: {db_error}")
         
-        logger.info(f"Ingress server updated: {ingress_url}")
+        logger.info(f"Ingress server for '{channel.name}' updated: {ingress_url}")
         
         return web.json_response({
             "success": True,
@@ -1758,41 +4272,34 @@ async def update_ingress_server(request: web.Request) -> web.Response:
 
 async def get_ingress_server(request: web.Request) -> web.Response:
     """Get current ingress server URL"""
-    try:
-        # Try to get from database first (using global db object)
-        if not stream_state.get("ingress_server"):
-            try:
-                config_collection = db.config
-                config = await config_collection.find_one({"key": "ingress_server"})
-                if config:
-                    stream_state["ingress_server"] = config.get("value", "")
-            except Exception as db_error:
-                logger.warning(f"Failed to load ingress server from DB: {db_error}")
-        
-        return web.json_response({
-            "success": True,
-            "ingress_server": stream_state.get("ingress_server", "")
-        })
-    except Exception as e:
-        logger.error(f"Get ingress server error: {e}")
-        return web.json_response({
-            "success": False,
-            "message": str(e)
-        }, status=500)
+    channel = get_stream_channel(request)
+    if channel is None:
+        return unknown_stream_channel()
+    # Loaded from the database on startup and kept current by updates and patches
+    return web.json_response({
+        "success": True,
+        "ingress_server": channel.state.ingress_server
+    })
 
 
 # ============================================================================
 # TEAM STATS & PAUSE SCREEN
 # ============================================================================
 
+async def load_team_stats() -> List[Dict]:
+    """All team stats, highest points first"""
+    team_stats = await db.team_stats.find().sort("points", -1).to_list(length=None)
+    
+    # Convert ObjectId to string
+    for team in team_stats:
+        team['_id'] = str(team['_id'])
+    return serialize_datetime(team_stats)
+
+
 async def get_team_stats(request: web.Request) -> web.Response:
     """Get all team stats for pause screen"""
     try:
-        team_stats = await db.team_stats.find().sort("points", -1).to_list(length=None)
-        
-        # Convert ObjectId to string
-        for team in team_stats:
-            team['_id'] = str(team['_id'])
+        team_stats = await query_cache.get("team_stats", load_team_stats)
         
         return web.json_response({
             "success": True,
@@ -1853,6 +4360,7 @@ async def update_team_stats(request: web.Request) -> web.Response:
             upsert=True
         )
         
+        await broadcast_team_stats()
         logger.info(f"Team stats updated: {team_name} - W:{wins} L:{losses} P:{points} Status:{status}")
         
         return web.json_response({
@@ -1899,6 +4407,7 @@ async def delete_team_stats(request: web.Request) -> web.Response:
         # Delete team stats (using global db object)
         team_stats_collection = db.team_stats
         result = await team_stats_collection.delete_one({"team_name": team_name})
+        await broadcast_team_stats()
         
         if result.deleted_count > 0:
             logger.info(f"Team stats deleted: {team_name}")
@@ -1945,11 +4454,17 @@ async def toggle_pause_screen(request: web.Request) -> web.Response:
             "timestamp": datetime.utcnow().isoformat()
         }
         
+        channel = get_stream_channel(request)
+        if channel is None:
+            return unknown_stream_channel()
+        
+        if not await set_stream_paused(channel, action == "show"):
+            return stream_conflict(channel)
         await broadcast_sse_event("pause_screen", event_data)
         if action == "show":
-            await broadcast_stream_event("showPause", event_data)
+            await broadcast_stream_event(channel, "showPause", event_data)
         else:
-            await broadcast_stream_event("hidePause", event_data)
+            await broadcast_stream_event(channel, "hidePause", event_data)
         
         logger.info(f"Pause screen {action} triggered")
         
@@ -3388,10 +5903,13 @@ async def logging_middleware(request: web.Request, handler):
     spammy_paths = [
         '/api/sse',
         '/api/stream-events',
+        '/api/stream-ws',
         '/api/match-state',
         '/api/stream-state',
         '/api/viewer-count',
-        '/api/viewer-ping'
+        '/api/viewer-ping',
+        '/api/viewer-disconnect',
+        '/api/time'
     ]
     if any(request.path.startswith(path) for path in spammy_paths):
         return await handler(request)
@@ -3526,7 +6044,7 @@ async def add_lap_time(request: web.Request) -> web.Response:
         conn.close()
         
         # Broadcast to SSE clients
-        await broadcast_sse_event("lap_updated", lap_data)
+        await emit_db_event("lap_updated", lap_data)
         
         return web.json_response({
             "success": True,
@@ -3594,7 +6112,7 @@ async def update_lap_time(request: web.Request) -> web.Response:
         # Broadcast to SSE clients
         update_data['_id'] = lap_id
         update_data = serialize_datetime(update_data)
-        await broadcast_sse_event("lap_updated", update_data)
+        await emit_db_event("lap_updated", update_data)
         
         return web.json_response({
             "success": True,
@@ -3636,7 +6154,7 @@ async def delete_lap_time(request: web.Request) -> web.Response:
         conn.close()
         
         # Broadcast to SSE clients
-        await broadcast_sse_event("lap_updated", {"id": lap_id})
+        await emit_db_event("lap_updated", {"id": lap_id})
         
         return web.json_response({
             "success": True,
@@ -3653,6 +6171,35 @@ async def delete_lap_time(request: web.Request) -> web.Response:
 # APPLICATION SETUP
 # ============================================================================
 
+background_tasks: List[asyncio.Task] = []
+
+
+async def start_background_tasks(app: web.Application):
+    """Start long-running tasks that live for the lifetime of the app"""
+    background_tasks.append(asyncio.create_task(sse_heartbeat_loop()))
+    logger.info(f"✓ SSE heartbeat started (every {SSE_HEARTBEAT_INTERVAL:g}s)")
+    
+    background_tasks.append(asyncio.create_task(viewer_count_ticker()))
+    background_tasks.append(asyncio.create_task(stream_journal_loop(STATE_JOURNAL_INTERVAL)))
+    
+    await event_backplane.start()
+    logger.info(f"✓ Event backplane: {event_backplane.name}")
+    
+    if SSE_EVENT_SOURCE == "change_streams":
+        for collection_name in CHANGE_STREAM_COLLECTIONS:
+            background_tasks.append(asyncio.create_task(tail_change_stream(collection_name)))
+
+
+async def stop_background_tasks(app: web.Application):
+    """Cancel background tasks on shutdown"""
+    await event_backplane.stop()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    await flush_stream_journals()  # Keep the last changes before exit
+
+
 async def init_app():
     """Initialize application"""
     logger.info("=" * 80)
@@ -3664,6 +6211,28 @@ async def init_app():
     logger.info("✓ SQLite backup database ready")
 
     init_lap_times_sqlite()
+    
+    try:
+        restored = restore_stream_state()
+        if restored:
+            logger.info(f"✓ Restored stream state for {restored} channels")
+    except Exception as e:
+        logger.warning(f"⚠ Could not restore stream state: {e}")
+    
+    try:
+        loaded = await load_ingress_servers()
+        if loaded:
+            logger.info(f"✓ Loaded stream sources for {loaded} channels")
+    except Exception as e:
+        logger.warning(f"⚠ Could not load stream sources: {e}")
+    
+    if EVENT_BACKPLANE != "memory":
+        try:
+            await sync_stream_versions()
+            logger.info("✓ Shared stream state versions ready")
+        except Exception as e:
+            logger.warning(f"⚠ Could not sync shared stream state versions: {e}")
+    
     # Create index for lap_times
     await lap_times.create_index([("time", 1)])
     
@@ -3870,6 +6439,15 @@ async def init_app():
     except Exception as e:
         logger.warning(f"⚠ Could not initialize matches: {e}")
     
+    # Team stats are part of the snapshot sent to every live viewer on connect
+    try:
+        stream_team_stats[:] = await load_team_stats()
+        for channel in stream_channels.values():
+            channel.snapshot_cache.clear()
+        logger.info(f"✓ Loaded stats for {len(stream_team_stats)} teams")
+    except Exception as e:
+        logger.warning(f"⚠ Could not load team stats: {e}")
+    
     logger.info("=" * 80)
     logger.info("Application Ready")
     logger.info("=" * 80)
@@ -3931,18 +6509,31 @@ def create_app() -> web.Application:
     
     # Live streaming endpoints
     app.router.add_get('/api/match-state', get_stream_state)
+    app.router.add_get('/api/match-state/{channel}', get_stream_state)
     app.router.add_get('/api/stream-state', get_stream_state)  # Alias
     app.router.add_post('/api/update-score', update_stream_score)
     app.router.add_post('/api/update-teams', update_stream_teams)
     app.router.add_post('/api/update-match-info', update_stream_match_info)
+    app.router.add_post('/api/update-overlay', update_stream_overlay)
     app.router.add_post('/api/reset', reset_stream_match)
+    app.router.add_post('/api/clock', update_match_clock)
+    app.router.add_get('/api/time', get_server_time)
     app.router.add_post('/api/control/start-match', trigger_match_start)
     app.router.add_post('/api/control/end-match', trigger_match_end)
     app.router.add_post('/api/control/show-pause', show_pause_screen)
     app.router.add_post('/api/control/hide-pause', hide_pause_screen)
     app.router.add_get('/api/stream-events', stream_sse_handler)
+    app.router.add_get('/api/stream-events/{channel}', stream_sse_handler)
+    if STREAM_WEBSOCKET:
+        app.router.add_get('/api/stream-ws', stream_ws_handler)
+        app.router.add_get('/api/stream-ws/{channel}', stream_ws_handler)
     app.router.add_post('/api/send-chat', send_stream_chat)
     app.router.add_get('/api/viewer-count', get_stream_viewer_count)
+    app.router.add_get('/api/viewer-count/{channel}', get_stream_viewer_count)
+    app.router.add_post('/api/viewer-ping', viewer_ping)
+    app.router.add_post('/api/viewer-disconnect', viewer_disconnect)
+    app.router.add_get('/api/sse-stats', get_sse_stats)
+    app.router.add_get('/api/fanout-latency', get_fanout_latency)
     app.router.add_post('/api/ingress-server', update_ingress_server)
     app.router.add_get('/api/ingress-server', get_ingress_server)
     app.router.add_get('/api/lap-times', get_lap_times)
@@ -3997,6 +6588,9 @@ def create_app() -> web.Application:
     
     # Startup hook
     app.on_startup.append(lambda app: init_app())
+    app.on_startup.append(start_background_tasks)
+    app.on_shutdown.append(drain_sse_clients)
+    app.on_cleanup.append(stop_background_tasks)
     
     logger.info("Application initialization complete")
     
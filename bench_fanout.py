@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""ASTERISK - SSE fan-out microbenchmark
+
+Measures the CPU cost of delivering one broadcast event to N connected
+stream viewers through the shared event ring, where the frame is encoded
+once and every client writes the same bytes. For comparison, the last
+column is the previous design end to end: the event is put into one
+asyncio.Queue per client and every client task encodes its own frame
+before writing it. Sockets are replaced with in-memory sinks so only
+server-side work is measured.
+
+    python bench_fanout.py                  # 1k, 10k and 50k clients
+    python bench_fanout.py --clients 5000 --events 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+# app.py builds its Mongo client at import time; it never connects here
+os.environ.setdefault("MONGODB_URL", "mongodb://127.0.0.1:27017")
+
+from aiohttp.test_utils import make_mocked_request
+
+import app
+
+
+class NullResponse:
+    """Stands in for a StreamResponse; counts writes instead of sending them"""
+
+    def __init__(self, done: "FanoutCounter"):
+        self.headers = {}
+        self.done = done
+
+    async def write(self, data: bytes):
+        self.done.hit(len(data))
+
+
+class FanoutCounter:
+    """Signals once every client has written the current event"""
+
+    def __init__(self, clients: int):
+        self.clients = clients
+        self.writes = 0
+        self.bytes = 0
+        self.event = asyncio.Event()
+
+    def reset(self):
+        self.writes = 0
+        self.event.clear()
+
+    def hit(self, size: int):
+        self.writes += 1
+        self.bytes += size
+        if self.writes == self.clients:
+            self.event.set()
+
+
+SAMPLE_EVENT = {
+    "messages": [{
+        "username": "Viewer-14025519",
+        "message": "GG WP! What a clutch in round 12",
+        "timestamp": 1760688000000
+    }]
+}
+
+
+async def bench_ring(clients: int, events: int) -> float:
+    """CPU seconds per event fanned out through the shared ring"""
+    ring = app.EventRing("bench", app.SSE_RING_SIZE)
+    counter = FanoutCounter(clients)
+    request = make_mocked_request("GET", "/api/stream-events")
+    tasks = []
+    for _ in range(clients):
+        client = app.SSEClient(request, NullResponse(counter), ring, ring.last_id)
+        tasks.append(asyncio.create_task(app.pump_sse_events(client)))
+    await asyncio.sleep(0)  # Let every pump reach its wait
+
+    cpu = 0.0
+    for _ in range(events):
+        counter.reset()
+        start = time.process_time()
+        payload = json.dumps(SAMPLE_EVENT, separators=(',', ':'))
+        ring.append(f'event: chatBatch\ndata: {payload}', compact=f'"chatBatch",{payload}', bulk=True)
+        await counter.event.wait()
+        cpu += time.process_time() - start
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return cpu / events
+
+
+async def pump_queue(queue: asyncio.Queue, response: NullResponse):
+    """A client of the previous design: wait on its own queue, encode, write"""
+    while True:
+        event_data = await queue.get()
+        await response.write(f'{event_data}\n\n'.encode('utf-8'))
+
+
+async def bench_queues(clients: int, events: int) -> float:
+    """CPU seconds per event fanned out through one asyncio.Queue per client"""
+    counter = FanoutCounter(clients)
+    queues = [asyncio.Queue() for _ in range(clients)]
+    tasks = [asyncio.create_task(pump_queue(queue, NullResponse(counter))) for queue in queues]
+    await asyncio.sleep(0)  # Let every client reach its get
+
+    cpu = 0.0
+    for _ in range(events):
+        counter.reset()
+        start = time.process_time()
+        event_message = f'event: chatBatch\ndata: {json.dumps(SAMPLE_EVENT)}'
+        for queue in queues:
+            await queue.put(event_message)
+        await counter.event.wait()
+        cpu += time.process_time() - start
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return cpu / events
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="SSE fan-out microbenchmark")
+    parser.add_argument("--clients", type=int, nargs="*", default=[1000, 10000, 50000])
+    parser.add_argument("--events", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'clients':>8}  {'ring ms/event':>14}  {'us/client':>10}  {'queues ms/event':>16}  {'us/client':>10}")
+    for clients in args.clients:
+        ring_cpu = await bench_ring(clients, args.events)
+        queue_cpu = await bench_queues(clients, args.events)
+        print(
+            f"{clients:>8}  {ring_cpu * 1000:>14.2f}  {ring_cpu / clients * 1e6:>10.2f}"
+            f"  {queue_cpu * 1000:>16.2f}  {queue_cpu / clients * 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
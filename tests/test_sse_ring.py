@@ -0,0 +1,71 @@
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("MONGODB_URL", "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=200")
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+import app
+
+
+def open_client(ring, topics):
+    request = make_mocked_request("GET", "/api/sse")
+    return app.SSEClient(request, web.StreamResponse(), ring, ring.last_id, topics)
+
+
+def broadcast(ring, event_type, count=1):
+    for _ in range(count):
+        ring.append(f'data: {{"type": "{event_type}"}}', app.get_sse_topic(event_type), event_type=event_type)
+
+
+class TopicLagTest(unittest.IsolatedAsyncioTestCase):
+    """A topic-filtered client only lags on events in its own topics"""
+
+    def setUp(self):
+        self.ring = app.EventRing("sse", 8)
+        self.stats = mock.patch.dict(app.SSE_STATS, {"dropped_events": 0, "evicted_clients": 0})
+        self.stats.start()
+
+    def tearDown(self):
+        self.stats.stop()
+
+    async def test_unsubscribed_events_do_not_evict(self):
+        client = open_client(self.ring, frozenset({"laps"}))
+        broadcast(self.ring, "match_updated", 20)
+        broadcast(self.ring, "lap_updated")
+
+        with mock.patch.object(app, "SSE_OVERFLOW_POLICY", "disconnect"):
+            self.assertTrue(app.skip_lagged_events(client))
+        frames, sent, _ = self.ring.frames_after(client.cursor, client.topics)
+        self.assertEqual([meta[0] for meta in sent], ["lap_updated"])
+        self.assertEqual(app.SSE_STATS["dropped_events"], 0)
+        self.assertEqual(app.SSE_STATS["evicted_clients"], 0)
+
+    async def test_unsubscribed_events_are_not_counted_as_dropped(self):
+        client = open_client(self.ring, frozenset({"laps"}))
+        broadcast(self.ring, "match_updated", 20)
+
+        with mock.patch.object(app, "SSE_OVERFLOW_POLICY", "drop_oldest"):
+            self.assertTrue(app.skip_lagged_events(client))
+        self.assertEqual(app.SSE_STATS["dropped_events"], 0)
+
+    async def test_lost_subscribed_events_still_evict(self):
+        client = open_client(self.ring, frozenset({"laps"}))
+        broadcast(self.ring, "lap_updated", 3)
+        broadcast(self.ring, "match_updated", 20)
+
+        with mock.patch.object(app, "SSE_OVERFLOW_POLICY", "disconnect"):
+            self.assertFalse(app.skip_lagged_events(client))
+        self.assertEqual(app.SSE_STATS["dropped_events"], 3)
+
+    async def test_lost_events_beyond_kept_history_are_detected(self):
+        client = open_client(self.ring, frozenset({"laps"}))
+        broadcast(self.ring, "lap_updated", 40)
+
+        self.assertGreater(self.ring.count_topic_events(client.topics, client.cursor, self.ring.first_id), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()